@@ -0,0 +1,271 @@
+# carga_api.py
+# Prueba de carga de la API: en proceso (ASGI, sin red) o sobre un socket local con uvicorn.
+# Genera payloads sintéticos de ClienteData con distribuciones similares a las de entrenamiento
+# y reporta throughput, latencias p50/p95/p99 y errores en un JSON comparable entre cambios.
+#
+# Uso:
+#   python benchmarks/carga_api.py --app main2 --modo proceso --concurrencia 16 --peticiones 2000
+#   python benchmarks/carga_api.py --modo socket --mezcla single=0.8,batch=0.1,form=0.1
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import httpx
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / "src"))
+
+# --- Distribuciones de entrenamiento (resumen de "Tabla Trabajo Grupal N°2.xlsx", 12.356 filas) ---
+# (media, desviación, mínimo, máximo). Las variables de monto son asimétricas y se generan con una log-normal.
+DISTRIBUCIONES = {
+    'Edad': (34.17, 13.14, 18, 79),
+    'Años_Trabajando': (6.95, 8.99, 0, 63),
+    'Ingresos': (59.75, 67.20, 12, 1079),
+    'Deuda_Comercial': (9.95, 6.73, 0.0, 40.7),
+    'Deuda_Credito': (1.96, 3.02, 0.0, 35.97),
+    'Otras_Deudas': (3.87, 5.44, 0.0, 63.47),
+    'Ratio_Ingresos_Deudas': (0.37, 0.30, 0.0, 2.15),
+}
+VARIABLES_ENTERAS = ['Edad', 'Años_Trabajando']
+VARIABLES_LOGNORMALES = ['Ingresos', 'Deuda_Comercial', 'Deuda_Credito', 'Otras_Deudas', 'Ratio_Ingresos_Deudas']
+FRECUENCIAS_EDUCACION = {'Med': 4320, 'SupInc': 2766, 'SupCom': 2580, 'Bas': 2005, 'Posg': 685}
+
+# Endpoint de cada tipo de petición de la mezcla
+RUTAS = {
+    'single': ('POST', '/predict'),
+    'batch': ('POST', '/predict_batch'),
+    'form': ('GET', '/form'),
+}
+
+
+# --- Payloads sintéticos ---
+def generar_columnas(n, rng):
+    """Genera n clientes en formato columnar ({variable: arreglo}) con distribuciones similares a las de entrenamiento."""
+    columnas = {}
+    for variable, (media, std, minimo, maximo) in DISTRIBUCIONES.items():
+        if variable in VARIABLES_LOGNORMALES:
+            sigma2 = np.log(1 + (std / max(media, 1e-9)) ** 2)
+            valores = rng.lognormal(np.log(max(media, 1e-9)) - sigma2 / 2, np.sqrt(sigma2), n)
+        else:
+            valores = rng.normal(media, std, n)
+        valores = np.clip(valores, minimo, maximo)
+        if variable in VARIABLES_ENTERAS:
+            columnas[variable] = np.rint(valores).astype(int)
+        else:
+            columnas[variable] = np.round(valores, 2)
+
+    categorias = list(FRECUENCIAS_EDUCACION)
+    pesos = np.array(list(FRECUENCIAS_EDUCACION.values()), dtype=float)
+    columnas['Nivel_Educacional'] = rng.choice(categorias, size=n, p=pesos / pesos.sum())
+    return columnas
+
+
+def generar_clientes(n, rng):
+    """Genera n payloads de ClienteData con distribuciones similares a las de entrenamiento."""
+    columnas = {variable: valores.tolist() for variable, valores in generar_columnas(n, rng).items()}
+    return [{variable: columnas[variable][i] for variable in columnas} for i in range(n)]
+
+
+def parsear_mezcla(texto):
+    """'single=0.8,batch=0.1,form=0.1' -> {'single': 0.8, 'batch': 0.1, 'form': 0.1} (normalizado)."""
+    mezcla = {}
+    for parte in texto.split(','):
+        tipo, peso = parte.split('=')
+        tipo = tipo.strip()
+        if tipo not in RUTAS:
+            raise ValueError(f"Tipo de petición desconocido: {tipo}. Opciones: {', '.join(RUTAS)}")
+        mezcla[tipo] = float(peso)
+    total = sum(mezcla.values())
+    return {tipo: peso / total for tipo, peso in mezcla.items()}
+
+
+def filtrar_mezcla(mezcla, app):
+    """Descarta los tipos cuyo endpoint no existe en la app (p. ej. /form en main.py)."""
+    rutas_app = {getattr(r, 'path', None) for r in app.routes}
+    disponibles = {t: p for t, p in mezcla.items() if RUTAS[t][1] in rutas_app}
+    for tipo in set(mezcla) - set(disponibles):
+        print(f"⚠️ La app no expone {RUTAS[tipo][1]}: se omite el tipo '{tipo}' de la mezcla.")
+    if not disponibles:
+        raise ValueError("Ningún tipo de la mezcla está disponible en la app.")
+    total = sum(disponibles.values())
+    return {tipo: peso / total for tipo, peso in disponibles.items()}
+
+
+# --- Servidor uvicorn local ---
+class ServidorLocal:
+    """Levanta la app con uvicorn en un hilo aparte, sobre un puerto local."""
+
+    def __init__(self, app, puerto):
+        import uvicorn
+        self.servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=puerto, log_level="warning"))
+        self.hilo = threading.Thread(target=self.servidor.run, daemon=True)
+        self.url = f"http://127.0.0.1:{puerto}"
+
+    def __enter__(self):
+        self.hilo.start()
+        while not self.servidor.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.servidor.should_exit = True
+        self.hilo.join(timeout=10)
+
+
+# --- Ejecución de la carga ---
+async def _ejecutar(cliente, plan, concurrencia):
+    """Envía las peticiones del plan con `concurrencia` workers; devuelve (tipo, latencia_s, ok) por petición."""
+    cola = asyncio.Queue()
+    for item in plan:
+        cola.put_nowait(item)
+    resultados = []
+
+    async def worker():
+        while True:
+            try:
+                tipo, cuerpo = cola.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            metodo, ruta = RUTAS[tipo]
+            inicio = time.perf_counter()
+            try:
+                respuesta = await cliente.request(metodo, ruta, json=cuerpo)
+                ok = respuesta.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            resultados.append((tipo, time.perf_counter() - inicio, ok))
+
+    await asyncio.gather(*(worker() for _ in range(concurrencia)))
+    return resultados
+
+
+def _resumir(latencias, errores, duracion):
+    latencias_ms = np.asarray(latencias) * 1000
+    total = len(latencias_ms)
+    p50, p95, p99 = np.percentile(latencias_ms, [50, 95, 99]) if total else (float('nan'),) * 3
+    return {
+        'peticiones': total,
+        'errores': errores,
+        'tasa_error': errores / total if total else 0.0,
+        'throughput_rps': total / duracion if duracion else 0.0,
+        'latencia_ms': {
+            'media': float(latencias_ms.mean()) if total else float('nan'),
+            'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+            'max': float(latencias_ms.max()) if total else float('nan'),
+        },
+    }
+
+
+def correr_carga(app, modo='proceso', concurrencia=16, peticiones=2000, mezcla=None,
+                 tamano_lote=100, calentamiento=20, semilla=21, puerto=8765):
+    """Ejecuta la prueba de carga y devuelve el resumen (global y por tipo de petición)."""
+    mezcla = filtrar_mezcla(mezcla or {'single': 1.0}, app)
+    rng = np.random.default_rng(semilla)
+
+    tipos = rng.choice(list(mezcla), size=peticiones, p=list(mezcla.values()))
+    clientes = iter(generar_clientes(int((tipos == 'single').sum() + (tipos == 'batch').sum() * tamano_lote), rng))
+    plan = []
+    for tipo in tipos:
+        if tipo == 'single':
+            plan.append((tipo, next(clientes)))
+        elif tipo == 'batch':
+            plan.append((tipo, [next(clientes) for _ in range(tamano_lote)]))
+        else:
+            plan.append((tipo, None))
+    plan_calentamiento = plan[:calentamiento]
+
+    async def sesion(cliente):
+        await _ejecutar(cliente, plan_calentamiento, concurrencia)
+        inicio = time.perf_counter()
+        resultados = await _ejecutar(cliente, plan, concurrencia)
+        return resultados, time.perf_counter() - inicio
+
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    if modo == 'proceso':
+        async def principal():
+            transporte = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://prueba", timeout=60) as cliente:
+                return await sesion(cliente)
+        resultados, duracion = asyncio.run(principal())
+    elif modo == 'socket':
+        with ServidorLocal(app, puerto) as servidor:
+            async def principal():
+                async with httpx.AsyncClient(base_url=servidor.url, limits=limites, timeout=60) as cliente:
+                    return await sesion(cliente)
+            resultados, duracion = asyncio.run(principal())
+    else:
+        raise ValueError(f"Modo desconocido: {modo}. Use 'proceso' o 'socket'.")
+
+    resumen = _resumir([r[1] for r in resultados], sum(not r[2] for r in resultados), duracion)
+    resumen['duracion_s'] = duracion
+    resumen['por_tipo'] = {}
+    for tipo in mezcla:
+        del_tipo = [r for r in resultados if r[0] == tipo]
+        resumen['por_tipo'][tipo] = _resumir([r[1] for r in del_tipo], sum(not r[2] for r in del_tipo), duracion)
+    return resumen
+
+
+# --- Metadatos para comparar corridas ---
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de predicción de Default.")
+    parser.add_argument('--app', default='main2', help="Módulo de src/ con la app FastAPI (main o main2).")
+    parser.add_argument('--modo', choices=['proceso', 'socket'], default='proceso')
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=2000)
+    parser.add_argument('--mezcla', default='single=0.8,batch=0.1,form=0.1',
+                        help="Pesos por tipo de petición: single, batch, form.")
+    parser.add_argument('--tamano-lote', type=int, default=100, help="Clientes por petición batch.")
+    parser.add_argument('--calentamiento', type=int, default=20)
+    parser.add_argument('--semilla', type=int, default=21)
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--salida', default=None, help="Ruta del JSON de resultados.")
+    args = parser.parse_args()
+
+    app = importlib.import_module(args.app).app
+    mezcla = parsear_mezcla(args.mezcla)
+    resumen = correr_carga(app, args.modo, args.concurrencia, args.peticiones, mezcla,
+                           args.tamano_lote, args.calentamiento, args.semilla, args.puerto)
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'parametros': {**vars(args), 'mezcla': mezcla},
+        'resultados': resumen,
+    }
+
+    salida = args.salida or RAIZ / 'benchmarks' / 'resultados' / f"carga_{args.app}_{args.modo}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)  # --salida puede ser un nombre sin carpeta
+    with open(salida, 'w', encoding='utf-8') as file:
+        json.dump(resultado, file, indent=2, ensure_ascii=False)
+
+    lat = resumen['latencia_ms']
+    print(f"\n🚦 {args.app} ({args.modo}) - concurrencia {args.concurrencia}")
+    print(f"Peticiones: {resumen['peticiones']} | Errores: {resumen['errores']} | Throughput: {resumen['throughput_rps']:.1f} req/s")
+    print(f"Latencia (ms) p50: {lat['p50']:.2f} | p95: {lat['p95']:.2f} | p99: {lat['p99']:.2f}")
+    for tipo, r in resumen['por_tipo'].items():
+        print(f"  {tipo:<7} n={r['peticiones']:<6} p50={r['latencia_ms']['p50']:.2f}ms p99={r['latencia_ms']['p99']:.2f}ms errores={r['errores']}")
+    print(f"✅ Resultados guardados en: {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# etapas_scoring.py
+# Microbenchmarks de cada etapa del scoring de la API, con control de regresiones A/B.
+#
+# Etapas: validación de ClienteData + .dict(), construcción del DataFrame, ENCODER_TARGET.transform,
+# predict_proba/predict del modelo y construcción de la respuesta. Tamaños de lote: 1, 100 y 10.000.
+#
+# `comparar` no usa una línea base guardada (dependiente de la máquina): mide en la misma corrida la versión de src/ y
+# model/ de una referencia git (A) y la del árbol de trabajo (B), cada una en un proceso trabajador, alternando rondas
+# A/B para que ambas vean el mismo ruido del equipo. La decisión usa la mediana de los ratios B/A por ronda.
+# Por defecto A es el merge-base con la rama principal (el código antes de los cambios de la rama bajo prueba).
+# Los lotes de n=1 (sub-milisegundo, dominados por el ruido) se reportan pero no cuentan para el control.
+#
+# Uso:
+#   python benchmarks/etapas_scoring.py medir                                # imprime y guarda resultados
+#   python benchmarks/etapas_scoring.py comparar --tolerancia 0.25          # A = merge-base con main; exit 1 si B es >25% más lenta
+#   python benchmarks/etapas_scoring.py comparar --ref v1.2                 # A = una referencia explícita
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from carga_api import RAIZ, generar_clientes
+
+TAMANOS_LOTE = [1, 100, 10_000]
+RAMAS_PRINCIPALES = ['origin/main', 'main', 'origin/master', 'master']
+ETAPAS = ['validacion', 'dataframe', 'encoder', 'modelo', 'respuesta']
+
+
+# --- Etapas del scoring (mismo código que la API) ---
+def preparar_etapas(api, payloads):
+    """
+    Devuelve {etapa: funcion_sin_argumentos}. Cada etapa recibe la salida ya calculada de la anterior,
+    de modo que solo se mide su propio costo.
+    """
+    clientes = [api.ClienteData(**p) for p in payloads]
+    dicts = [c.dict() for c in clientes]
+    df_input = pd.DataFrame(dicts, columns=api.COLUMNAS_INPUT)
+    df_input['Nivel_Educacional'] = df_input['Nivel_Educacional'].astype(str)
+    df_encoded = api.ENCODER_TARGET.transform(df_input)
+    probs = api.MODELO_ML.predict_proba(df_encoded)[:, 1]
+    clases = api.MODELO_ML.predict(df_encoded)
+
+    def validacion():
+        return [api.ClienteData(**p).dict() for p in payloads]
+
+    def dataframe():
+        df = pd.DataFrame(dicts, columns=api.COLUMNAS_INPUT)
+        df['Nivel_Educacional'] = df['Nivel_Educacional'].astype(str)
+        return df
+
+    def encoder():
+        return api.ENCODER_TARGET.transform(df_input)
+
+    def modelo():
+        return api.MODELO_ML.predict_proba(df_encoded), api.MODELO_ML.predict(df_encoded)
+
+    def respuesta():
+        return [api.construir_respuesta(c, p) for c, p in zip(clases, probs)]
+
+    return {
+        'validacion': validacion,
+        'dataframe': dataframe,
+        'encoder': encoder,
+        'modelo': modelo,
+        'respuesta': respuesta,
+    }
+
+
+def calibrar(funcion, tiempo_minimo=0.2):
+    """Número de llamadas por medición para que cada una dure al menos tiempo_minimo (como timeit)."""
+    funcion()  # calentamiento
+    numero = 1
+    while True:
+        duracion = medir_bloque(funcion, numero) * numero
+        if duracion >= tiempo_minimo:
+            return numero
+        numero *= 2 if duracion == 0 else max(2, int(tiempo_minimo / duracion))
+
+
+def medir_bloque(funcion, numero):
+    """Tiempo por llamada (segundos) de `numero` llamadas seguidas, con el recolector de basura desactivado."""
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        inicio = time.perf_counter()
+        for _ in range(numero):
+            funcion()
+        return (time.perf_counter() - inicio) / numero
+    finally:
+        if gc_activo:
+            gc.enable()
+
+
+def cronometrar(funcion, repeticiones=7, tiempo_minimo=0.2):
+    """Tiempo por llamada en segundos: mediana entre repeticiones de al menos tiempo_minimo cada una."""
+    numero = calibrar(funcion, tiempo_minimo)
+    return float(np.median([medir_bloque(funcion, numero) for _ in range(repeticiones)]))
+
+
+def etapas_por_tamano(api, n, semilla=21):
+    """Etapas para un lote de n clientes; los payloads dependen solo de (semilla, n), iguales en A y B."""
+    return preparar_etapas(api, generar_clientes(n, np.random.default_rng([semilla, n])))
+
+
+def medir(app='main', tamanos=TAMANOS_LOTE, repeticiones=7, semilla=21):
+    """Mide todas las etapas para cada tamaño de lote. Devuelve {etapa: {tamaño: segundos_por_lote}}."""
+    api = importlib.import_module(app)
+    resultados = {}
+    for n in tamanos:
+        for etapa, funcion in etapas_por_tamano(api, n, semilla).items():
+            resultados.setdefault(etapa, {})[str(n)] = cronometrar(funcion, repeticiones)
+    return resultados
+
+
+def imprimir(resultados):
+    tabla = pd.DataFrame(resultados).T * 1000
+    tabla.columns = [f'n={c} (ms)' for c in tabla.columns]
+    print(tabla.to_string(float_format='{:.4f}'.format))
+
+
+# --- Comparación A/B en la misma corrida ---
+def trabajador(raiz, app, semilla):
+    """
+    Proceso trabajador: importa la app desde raiz/src y responde mediciones por stdin/stdout.
+    Cada línea recibida es "etapa n"; la respuesta es el tiempo por llamada (segundos) de un bloque calibrado.
+    """
+    canal = sys.stdout
+    sys.stdout = sys.stderr  # los print de la app (carga de artefactos) no se mezclan con el protocolo
+    sys.path.insert(0, os.path.join(raiz, 'src'))
+    api = importlib.import_module(app)
+    etapas, numeros = {}, {}
+    print('listo', file=canal, flush=True)
+    for linea in sys.stdin:
+        etapa, n = linea.split()
+        if n not in etapas:
+            etapas[n] = etapas_por_tamano(api, int(n), semilla)
+        funcion = etapas[n][etapa]
+        if (etapa, n) not in numeros:
+            numeros[(etapa, n)] = calibrar(funcion)
+        print(repr(medir_bloque(funcion, numeros[(etapa, n)])), file=canal, flush=True)
+
+
+class Trabajador:
+    """Cliente de un proceso trabajador (ver trabajador())."""
+
+    def __init__(self, raiz, app, semilla):
+        self.proceso = subprocess.Popen(
+            [sys.executable, __file__, '--trabajador', str(raiz), '--app', app, '--semilla', str(semilla)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        self._leer()  # 'listo'
+
+    def _leer(self):
+        linea = self.proceso.stdout.readline()
+        if not linea:
+            raise RuntimeError(f"El trabajador terminó inesperadamente (código {self.proceso.wait()}).")
+        return linea.strip()
+
+    def medir(self, etapa, n):
+        self.proceso.stdin.write(f"{etapa} {n}\n")
+        self.proceso.stdin.flush()
+        return float(self._leer())
+
+    def cerrar(self):
+        self.proceso.stdin.close()
+        self.proceso.wait()
+
+
+def _git(*argumentos):
+    proceso = subprocess.run(['git', '-C', str(RAIZ), *argumentos], capture_output=True, text=True)
+    return proceso.stdout.strip() if proceso.returncode == 0 else None
+
+
+def referencia_por_defecto(rama=None):
+    """Commit merge-base entre HEAD y la rama principal (`rama` o la primera de RAMAS_PRINCIPALES que exista)."""
+    for candidata in [rama] if rama else RAMAS_PRINCIPALES:
+        if _git('rev-parse', '--verify', '--quiet', candidata + '^{commit}'):
+            base = _git('merge-base', 'HEAD', candidata)
+            if base:
+                return base, candidata
+    raise SystemExit("No se encontró la rama principal para calcular el merge-base; indique la referencia con --ref.")
+
+
+def extraer_referencia(ref, destino):
+    """Extrae src/ y model/ de la referencia git `ref` en `destino`."""
+    archivo = subprocess.run(['git', '-C', str(RAIZ), 'archive', '--format=tar', ref, 'src', 'model'],
+                             capture_output=True, check=True).stdout
+    with tempfile.TemporaryFile() as tar:
+        tar.write(archivo)
+        tar.seek(0)
+        with tarfile.open(fileobj=tar) as contenido:
+            contenido.extractall(destino, filter='data')
+
+
+def comparar_ab(ref='HEAD', app='main', tamanos=TAMANOS_LOTE, rondas=15, semilla=21):
+    """
+    Mide cada (etapa, tamaño) alternando A (referencia git) y B (árbol de trabajo) durante `rondas` rondas.
+    El orden A/B se invierte en cada ronda. Devuelve {(etapa, n): (tiempos_a, tiempos_b)}.
+    """
+    with tempfile.TemporaryDirectory() as destino:
+        extraer_referencia(ref, destino)
+        a, b = Trabajador(destino, app, semilla), Trabajador(RAIZ, app, semilla)
+        try:
+            mediciones = {}
+            for n in tamanos:
+                for etapa in ETAPAS:
+                    tiempos_a, tiempos_b = [], []
+                    for ronda in range(rondas):
+                        orden = [(a, tiempos_a), (b, tiempos_b)]
+                        for trabajador_ab, tiempos in (orden if ronda % 2 == 0 else orden[::-1]):
+                            tiempos.append(trabajador_ab.medir(etapa, n))
+                    mediciones[(etapa, n)] = (tiempos_a, tiempos_b)
+        finally:
+            a.cerrar()
+            b.cerrar()
+    return mediciones
+
+
+def comparar(mediciones, tolerancia, n_minimo=100):
+    """
+    Devuelve (tabla, regresiones) a partir de las mediciones A/B.
+    Una etapa es regresión si la mediana de los ratios B/A supera 1 + tolerancia y B es más lenta en al menos
+    3 de cada 4 rondas (cuartil inferior del ratio > 1). Los lotes menores que n_minimo (sub-milisegundo, dominados
+    por el ruido) se reportan pero no cuentan para el control.
+    """
+    filas, regresiones = [], []
+    for (etapa, n), (tiempos_a, tiempos_b) in mediciones.items():
+        ratios = np.asarray(tiempos_b) / np.asarray(tiempos_a)
+        mediana, q25, q75 = np.percentile(ratios, [50, 25, 75])
+        controlada = n >= n_minimo
+        filas.append({'etapa': etapa, 'n': n, 'a_ms': np.median(tiempos_a) * 1000, 'b_ms': np.median(tiempos_b) * 1000,
+                      'ratio': mediana, 'ratio_q25': q25, 'ratio_q75': q75, 'controlada': controlada})
+        if controlada and mediana > 1 + tolerancia and q25 > 1:
+            regresiones.append(f"{etapa} (n={n}): {mediana:.2f}x [{q25:.2f}-{q75:.2f}]")
+    return pd.DataFrame(filas), regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks por etapa del scoring de la API.")
+    parser.add_argument('accion', nargs='?', choices=['medir', 'comparar'], default='medir')
+    parser.add_argument('--app', default='main', help="Módulo de src/ con la app FastAPI (main o main2).")
+    parser.add_argument('--repeticiones', type=int, default=7, help="Repeticiones por etapa (acción medir).")
+    parser.add_argument('--ref', default=None,
+                        help="Referencia git (A) contra la que se compara el árbol de trabajo (B). Por defecto, el "
+                             "merge-base de HEAD con la rama principal (--rama-base).")
+    parser.add_argument('--rama-base', default=None,
+                        help="Rama principal para el merge-base (por defecto, la primera que exista de: "
+                             + ", ".join(RAMAS_PRINCIPALES) + ").")
+    parser.add_argument('--rondas', type=int, default=15, help="Rondas A/B por etapa y tamaño (acción comparar).")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Aumento relativo permitido antes de considerar regresión (0.25 = 25%%).")
+    parser.add_argument('--n-minimo', type=int, default=100,
+                        help="Tamaño de lote mínimo que cuenta para el control (por defecto 100: los lotes de n=1 "
+                             "se reportan pero quedan excluidos).")
+    parser.add_argument('--semilla', type=int, default=21)
+    parser.add_argument('--salida', default=None, help="Ruta del JSON de resultados.")
+    parser.add_argument('--trabajador', default=None, help=argparse.SUPPRESS)  # uso interno (subproceso A/B)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    if args.trabajador is not None:
+        trabajador(args.trabajador, args.app, args.semilla)
+        return
+
+    registro = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'maquina': platform.platform(),
+        'app': args.app,
+    }
+
+    if args.accion == 'medir':
+        resultados = medir(args.app, repeticiones=args.repeticiones, semilla=args.semilla)
+        imprimir(resultados)
+        registro['segundos_por_lote'] = resultados
+    else:
+        if args.ref is None:
+            args.ref, rama = referencia_por_defecto(args.rama_base)
+            print(f"Referencia A: merge-base con {rama} ({args.ref[:12]})")
+        if _git('rev-parse', args.ref + '^{commit}') == _git('rev-parse', 'HEAD') and not _git('status', '--porcelain', 'src', 'model'):
+            print("⚠️ A y B son el mismo código (la referencia es HEAD y src/ y model/ no tienen cambios): "
+                  "la comparación no puede detectar regresiones.")
+        mediciones = comparar_ab(args.ref, args.app, rondas=args.rondas, semilla=args.semilla)
+        tabla, regresiones = comparar(mediciones, args.tolerancia, args.n_minimo)
+        print(f"\n📏 Comparación A/B: A = {args.ref}, B = árbol de trabajo ({args.rondas} rondas, ratio = B/A)")
+        print(tabla.to_string(index=False, float_format='{:.4f}'.format))
+        registro.update({'ref': args.ref, 'rondas': args.rondas, 'tolerancia': args.tolerancia,
+                         'comparacion': tabla.to_dict(orient='records'), 'regresiones': regresiones})
+
+    salida = args.salida or RAIZ / 'benchmarks' / 'resultados' / f"etapas_{args.accion}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)  # --salida puede ser un nombre sin carpeta
+    with open(salida, 'w', encoding='utf-8') as file:
+        json.dump(registro, file, indent=2, ensure_ascii=False, default=lambda v: v.item())
+    print(f"✅ Resultados guardados en: {salida}")
+
+    if args.accion == 'comparar':
+        if regresiones:
+            print(f"\n❌ Regresiones sobre la tolerancia de {args.tolerancia:.0%}: " + "; ".join(regresiones))
+            sys.exit(1)
+        print(f"\n✅ Ninguna etapa (n >= {args.n_minimo}) supera la tolerancia de {args.tolerancia:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# precision_scoring.py
+# Benchmark del scoring masivo offline: camino habitual en float64 (DataFrame -> ENCODER_TARGET.transform -> predict_proba)
+# frente al PuntuadorLineal con buffers reutilizables en float64 y float32 (src/scoring_precision.py).
+# Reporta throughput (filas/s), memoria pico adicional (tracemalloc) y la diferencia máxima contra predict_proba en float64.
+# Cada modo corre en un subproceso: si el camino pandas se queda sin memoria (10M filas en equipos chicos) se registra
+# como error y el resto del benchmark continúa.
+#
+# Uso:
+#   python benchmarks/precision_scoring.py                           # 1M y 10M filas
+#   python benchmarks/precision_scoring.py --filas 1000000 --repeticiones 5
+
+import argparse
+import gc
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from carga_api import RAIZ, generar_columnas
+from scoring_precision import PuntuadorLineal, TOLERANCIA_FLOAT32
+
+MODOS = ['float64_pandas', 'float64_buffer', 'float32_buffer']
+
+
+def generar_datos(n, semilla=21):
+    """DataFrame sintético de n filas; la variable categórica reutiliza los mismos objetos str (como al leer un archivo)."""
+    columnas = generar_columnas(n, np.random.default_rng(semilla))
+    categorias, codigos = np.unique(columnas['Nivel_Educacional'], return_inverse=True)
+    columnas['Nivel_Educacional'] = categorias.astype(object)[codigos]
+    return pd.DataFrame(columnas)
+
+
+def preparar_modos(api, df):
+    """Devuelve {modo: funcion_sin_argumentos -> probabilidades de default}."""
+    df_input = df[api.COLUMNAS_INPUT]
+    puntuadores = {
+        'float64_buffer': PuntuadorLineal(api.MODELO_ML, api.ENCODER_TARGET, api.COLUMNAS_INPUT, dtype=np.float64),
+        'float32_buffer': PuntuadorLineal(api.MODELO_ML, api.ENCODER_TARGET, api.COLUMNAS_INPUT, dtype=np.float32),
+    }
+    salidas = {modo: np.empty(len(df), dtype=p.dtype) for modo, p in puntuadores.items()}
+
+    def float64_pandas():
+        return api.MODELO_ML.predict_proba(api.ENCODER_TARGET.transform(df_input))[:, 1]
+
+    modos = {'float64_pandas': float64_pandas}
+    for modo, puntuador in puntuadores.items():
+        # La salida también se preasigna: en un proceso offline se reutiliza entre lotes
+        modos[modo] = lambda p=puntuador, s=salidas[modo]: p.puntuar(df_input, salida=s)
+    return modos
+
+
+def medir_memoria(funcion):
+    """Memoria pico (bytes) asignada durante la llamada, sin contar lo ya asignado antes."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return pico
+
+
+def medir_tiempo(funcion, repeticiones):
+    """Mejor tiempo (segundos) entre repeticiones."""
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def referencia_por_bloques(api, df, tamano_bloque=1_000_000):
+    """predict_proba(...)[:, 1] en float64 calculado por bloques (memoria acotada), para medir la diferencia de cada modo."""
+    df_input = df[api.COLUMNAS_INPUT]
+    return np.concatenate([
+        api.MODELO_ML.predict_proba(api.ENCODER_TARGET.transform(df_input.iloc[i:i + tamano_bloque]))[:, 1]
+        for i in range(0, len(df_input), tamano_bloque)
+    ])
+
+
+def medir_modo(app, n, modo, repeticiones, semilla=21):
+    """Mide un modo en el proceso actual."""
+    api = importlib.import_module(app)
+    df = generar_datos(n, semilla)
+    referencia = referencia_por_bloques(api, df)
+    funcion = preparar_modos(api, df)[modo]
+    diferencia = float(np.max(np.abs(funcion() - referencia)))
+    del referencia
+    segundos = medir_tiempo(funcion, repeticiones)
+    pico = medir_memoria(funcion)
+    return {'filas': n, 'modo': modo, 'segundos': segundos, 'filas_por_segundo': n / segundos,
+            'memoria_pico_mb': pico / 2**20, 'max_dif_vs_float64': diferencia}
+
+
+def medir(app='main', filas=(1_000_000, 10_000_000), repeticiones=3, semilla=21):
+    """Mide cada (filas, modo) en un subproceso aislado."""
+    resultados = []
+    for n in filas:
+        for modo in MODOS:
+            proceso = subprocess.run(
+                [sys.executable, __file__, '--app', app, '--repeticiones', str(repeticiones),
+                 '--semilla', str(semilla), '--filas', str(n), '--modo', modo],
+                capture_output=True, text=True,
+            )
+            if proceso.returncode == 0:
+                resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+                print(f"n={n:>10,} {modo:<15} {resultado['segundos']:8.3f} s {resultado['filas_por_segundo']:14,.0f} filas/s "
+                      f"pico {resultado['memoria_pico_mb']:9.1f} MB  max|dif| {resultado['max_dif_vs_float64']:.2e}")
+            else:
+                motivo = "sin memoria (proceso terminado)" if proceso.returncode < 0 else proceso.stderr.strip()[-300:]
+                resultado = {'filas': n, 'modo': modo, 'error': motivo}
+                print(f"n={n:>10,} {modo:<15} ❌ {motivo}")
+            resultados.append(resultado)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput y memoria del scoring masivo en float64 y float32.")
+    parser.add_argument('--app', default='main', help="Módulo de src/ con la app FastAPI (main o main2).")
+    parser.add_argument('--filas', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=21)
+    parser.add_argument('--salida', default=None, help="Ruta del JSON de resultados.")
+    parser.add_argument('--modo', choices=MODOS, default=None, help=argparse.SUPPRESS)  # uso interno (subproceso)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    if args.modo is not None:
+        print(json.dumps(medir_modo(args.app, args.filas[0], args.modo, args.repeticiones, args.semilla)))
+        return
+
+    resultados = medir(args.app, args.filas, args.repeticiones, args.semilla)
+
+    excedidos = [r for r in resultados
+                 if r['modo'] == 'float32_buffer' and r.get('max_dif_vs_float64', 0) > TOLERANCIA_FLOAT32]
+    if excedidos:
+        print(f"\n❌ float32 supera la tolerancia documentada ({TOLERANCIA_FLOAT32:.0e}) en: "
+              + ", ".join(f"n={r['filas']}" for r in excedidos))
+    else:
+        print(f"\n✅ float32 dentro de la tolerancia documentada ({TOLERANCIA_FLOAT32:.0e}).")
+
+    salida = args.salida or RAIZ / 'benchmarks' / 'resultados' / f"precision_{datetime.now():%Y%m%d_%H%M%S}.json"
+    Path(salida).parent.mkdir(parents=True, exist_ok=True)  # --salida puede ser un nombre sin carpeta
+    with open(salida, 'w', encoding='utf-8') as file:
+        json.dump({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'maquina': platform.platform(),
+            'app': args.app,
+            'tolerancia_float32': TOLERANCIA_FLOAT32,
+            'resultados': resultados,
+        }, file, indent=2, ensure_ascii=False)
+    print(f"✅ Resultados guardados en: {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,22 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import subprocess
+import sys
+
+from datos_streaming import muestreo_estratificado
+
+# --- Modo streaming ---
+# True = perfil en una sola pasada por bloques (sin cargar el archivo en memoria), con figuras guardadas
+# en archivos PNG (sin plt.show()). Recomendado para datasets más grandes que la RAM.
+MODO_STREAMING = False
+
+# --- Muestra estratificada (opcional) ---
+# None = análisis sobre el archivo completo. Un entero (ej: 5_000) toma una muestra estratificada
+# en una sola pasada, útil para iterar rápido sobre datasets muy grandes.
+N_MUESTRA = None
+ESTRATOS_MUESTRA = ('Default', 'Nivel_Educacional')
+SEMILLA_MUESTRA = 21
 
 # --- Cargar datos ---
 archivo = "Tabla Trabajo Grupal N°2.xlsx"
@@ -11,15 +27,24 @@ ruta_completa = os.path.join(os.path.dirname(__file__), archivo)
 
 if not os.path.exists(ruta_completa):
     raise FileNotFoundError(f"Archivo no encontrado en: {ruta_completa}")
+elif MODO_STREAMING:
+    # Proceso aparte: los workers que renderizan las figuras no deben volver a ejecutar este script
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    subprocess.run([sys.executable, os.path.join(carpeta, 'perfil_streaming.py'), ruta_completa], cwd=carpeta, check=True)
+    sys.exit(0)
+
+if N_MUESTRA is not None:
+    df = muestreo_estratificado(ruta_completa, N_MUESTRA, ESTRATOS_MUESTRA, SEMILLA_MUESTRA)
 else:
     df = pd.read_excel(ruta_completa, sheet_name='Desarrollo', engine='openpyxl')
 df.columns = df.columns.str.strip()
 
 print(f'La base de datos cuenta con {df.shape[0]} registros y {df.shape[1]} columnas')
 
-# --- Limpieza básica ---
-df.drop_duplicates(inplace=True)
-df.drop(columns=['Id_Cliente'], inplace=True)
+# --- Limpieza básica (la muestra estratificada ya viene limpia) ---
+if N_MUESTRA is None:
+    df.drop_duplicates(inplace=True)
+    df.drop(columns=['Id_Cliente'], inplace=True)
 
 print(f'Dataset limpio: {df.shape[0]} registros y {df.shape[1]} columnas')
 print(f"Datos faltantes por columna:\n{df.isnull().sum()}")
@@ -0,0 +1,127 @@
+# bootstrap_metricas.py
+# Intervalos de confianza bootstrap para las métricas de evaluar_modelo_por_f1.
+# Los modelos se puntúan una sola vez: cada réplica es una matriz de índices remuestreados sobre los puntajes.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+METRICAS = ['AUC', 'KS', 'Threshold', 'Accuracy', 'Precision', 'Recall', 'F1']
+
+
+# --- Métricas vectorizadas para un lote de réplicas ---
+def _metricas_lote(pesos, y_ord, s_ord, fin_grupo):
+    """
+    Calcula las métricas para B réplicas a la vez.
+    pesos: matriz (B, n) con las veces que cada fila (ordenada por puntaje descendente) aparece en la réplica.
+    fin_grupo: posición de la última fila de cada grupo de puntajes empatados (umbrales candidatos).
+    """
+    tp = np.cumsum(pesos * y_ord, axis=1)[:, fin_grupo]
+    fp = np.cumsum(pesos * (1 - y_ord), axis=1)[:, fin_grupo]
+    P = tp[:, -1:]
+    N = fp[:, -1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = np.hstack([np.zeros_like(P), tp]) / P
+        fpr = np.hstack([np.zeros_like(N), fp]) / N
+        auc = np.sum(np.diff(fpr, axis=1) * (tpr[:, 1:] + tpr[:, :-1]) / 2, axis=1)
+        ks = np.max(tpr - fpr, axis=1)
+
+        # Umbral óptimo por F1 (predice 1 si prob >= umbral), igual que evaluar_modelo_por_f1
+        f1_scores = 2 * tp / (tp + fp + P)
+        idx_max = np.argmax(f1_scores, axis=1)
+        filas = np.arange(len(pesos))
+        tp_o = tp[filas, idx_max]
+        fp_o = fp[filas, idx_max]
+        P, N = P[:, 0], N[:, 0]
+
+        return {
+            'AUC': auc,
+            'KS': ks,
+            'Threshold': s_ord[fin_grupo][idx_max],
+            'Accuracy': (tp_o + N - fp_o) / (P + N),
+            'Precision': tp_o / (tp_o + fp_o),
+            'Recall': tp_o / P,
+            'F1': f1_scores[filas, idx_max],
+        }
+
+
+def _preparar_puntajes(y, probs):
+    """Ordena por puntaje descendente y ubica el final de cada grupo de empates."""
+    orden = np.argsort(-probs, kind='mergesort')
+    s_ord = probs[orden]
+    fin_grupo = np.append(np.flatnonzero(np.diff(s_ord)), len(s_ord) - 1)
+    return orden, y[orden].astype(float), s_ord, fin_grupo
+
+
+def _replicas_worker(y, scores_por_modelo, n_replicas, semilla, tamano_lote):
+    """Tarea de un proceso: genera n_replicas remuestreos (mismos índices para todos los modelos)."""
+    rng = np.random.default_rng(semilla)
+    n = len(y)
+    preparados = {nombre: _preparar_puntajes(y, probs) for nombre, probs in scores_por_modelo.items()}
+    resultados = {nombre: {m: [] for m in METRICAS} for nombre in scores_por_modelo}
+
+    for inicio in range(0, n_replicas, tamano_lote):
+        B = min(tamano_lote, n_replicas - inicio)
+        # Matriz de índices (B, n) -> conteos por fila, en una sola llamada a bincount
+        indices = rng.integers(0, n, size=(B, n))
+        desplazados = indices + (np.arange(B) * n)[:, None]
+        pesos = np.bincount(desplazados.ravel(), minlength=B * n).reshape(B, n)
+
+        for nombre, (orden, y_ord, s_ord, fin_grupo) in preparados.items():
+            lote = _metricas_lote(pesos[:, orden], y_ord, s_ord, fin_grupo)
+            for m in METRICAS:
+                resultados[nombre][m].append(lote[m])
+
+    return {nombre: {m: np.concatenate(v) for m, v in met.items()} for nombre, met in resultados.items()}
+
+
+# --- Intervalos de confianza ---
+def intervalos_bootstrap(y, scores_por_modelo, muestra='Test', n_replicas=2000, nivel=0.95,
+                         semilla=21, n_procesos=None, tamano_lote=100):
+    """
+    Intervalos de confianza (percentil) para cada métrica y modelo, a partir de puntajes ya calculados.
+    scores_por_modelo: {'logit_sk': probs, 'tree': probs} sobre las mismas filas y.
+    Todos los modelos usan las mismas réplicas, por lo que también se reporta la diferencia pareada
+    entre el primer modelo y cada uno de los demás (si el IC no contiene 0, la diferencia es significativa).
+    """
+    y = np.asarray(y)
+    scores_por_modelo = {nombre: np.asarray(p, dtype=float) for nombre, p in scores_por_modelo.items()}
+    n_procesos = n_procesos or os.cpu_count() or 1
+    n_procesos = max(1, min(n_procesos, n_replicas // tamano_lote or 1))
+
+    # Repartimos las réplicas entre procesos con semillas independientes
+    semillas = np.random.SeedSequence(semilla).spawn(n_procesos)
+    cuotas = [n_replicas // n_procesos + (i < n_replicas % n_procesos) for i in range(n_procesos)]
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        partes = list(pool.map(
+            _replicas_worker,
+            [y] * n_procesos, [scores_por_modelo] * n_procesos, cuotas, semillas, [tamano_lote] * n_procesos
+        ))
+    replicas = {
+        nombre: {m: np.concatenate([p[nombre][m] for p in partes]) for m in METRICAS}
+        for nombre in scores_por_modelo
+    }
+
+    # Estimado puntual sobre la muestra original (pesos = 1)
+    cola = (1 - nivel) / 2 * 100
+    filas = []
+    for nombre, probs in scores_por_modelo.items():
+        orden, y_ord, s_ord, fin_grupo = _preparar_puntajes(y, probs)
+        puntual = _metricas_lote(np.ones((1, len(y))), y_ord, s_ord, fin_grupo)
+        for m in METRICAS:
+            inf, sup = np.nanpercentile(replicas[nombre][m], [cola, 100 - cola])
+            filas.append({'Modelo': nombre, 'Muestra': muestra, 'Metrica': m,
+                          'Estimado': float(puntual[m][0]), 'IC_Inf': inf, 'IC_Sup': sup})
+
+    nombres = list(scores_por_modelo)
+    for otro in nombres[1:]:
+        for m in METRICAS:
+            dif = replicas[nombres[0]][m] - replicas[otro][m]
+            estimado = [f['Estimado'] for f in filas if f['Metrica'] == m and f['Modelo'] in (nombres[0], otro)]
+            inf, sup = np.nanpercentile(dif, [cola, 100 - cola])
+            filas.append({'Modelo': f'{nombres[0]} - {otro}', 'Muestra': muestra, 'Metrica': m,
+                          'Estimado': estimado[0] - estimado[1], 'IC_Inf': inf, 'IC_Sup': sup})
+
+    return pd.DataFrame(filas)
@@ -0,0 +1,128 @@
+# datos_streaming.py
+# Lectura por bloques del dataset para procesos que no caben en memoria.
+
+import os
+import numpy as np
+import pandas as pd
+
+
+# --- Resolución de rutas (misma convención que cargar_datos) ---
+def resolver_ruta(nombre_archivo):
+    """Devuelve la ruta absoluta del archivo, relativa a la carpeta de este script si no es absoluta."""
+    if os.path.isabs(nombre_archivo):
+        ruta = nombre_archivo
+    else:
+        ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), nombre_archivo)
+
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"⚠️ Archivo no encontrado: {ruta}")
+    return ruta
+
+
+# --- Lectura por bloques ---
+def _bloques_excel(ruta, tamano_bloque, hoja):
+    """Itera una hoja Excel en modo read_only (openpyxl), sin cargarla completa."""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro[hoja].iter_rows(values_only=True)
+        columnas = [str(c).strip() for c in next(filas)]
+        buffer = []
+        for fila in filas:
+            buffer.append(fila)
+            if len(buffer) == tamano_bloque:
+                yield pd.DataFrame(buffer, columns=columnas)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columnas)
+    finally:
+        libro.close()
+
+
+def leer_por_bloques(nombre_archivo, tamano_bloque=50_000, hoja='Desarrollo'):
+    """
+    Genera DataFrames de a lo más `tamano_bloque` filas con la misma limpieza que cargar_datos.
+    Soporta CSV (.csv, .csv.gz) y Excel (.xlsx). Los duplicados solo se eliminan dentro de cada bloque.
+    """
+    ruta = resolver_ruta(nombre_archivo)
+
+    if ruta.endswith(('.xlsx', '.xlsm')):
+        bloques = _bloques_excel(ruta, tamano_bloque, hoja)
+    else:
+        bloques = pd.read_csv(ruta, chunksize=tamano_bloque)
+
+    for bloque in bloques:
+        bloque.columns = bloque.columns.str.strip()
+        bloque = bloque.drop_duplicates()
+        bloque = bloque.drop(columns=['Id_Cliente'], errors='ignore')
+        if len(bloque):
+            yield bloque
+
+
+# --- Partición train/test reproducible por bloque ---
+def particionar_bloque(bloque, indice_bloque, semilla=21, fraccion_test=0.3):
+    """
+    Separa un bloque en (train, test) con una semilla derivada del índice del bloque,
+    de modo que cada pasada sobre el archivo asigna las mismas filas a cada partición.
+    """
+    rng = np.random.default_rng([semilla, indice_bloque])
+    es_test = rng.random(len(bloque)) < fraccion_test
+    return bloque[~es_test], bloque[es_test]
+
+
+# --- Muestreo estratificado en una pasada ---
+def _asignar_cuotas(conteos, n_muestra):
+    """Reparte n_muestra entre estratos de forma proporcional (método del mayor resto)."""
+    total = conteos.sum()
+    exactas = conteos * min(n_muestra, total) / total
+    cuotas = np.floor(exactas).astype(int)
+    faltantes = int(min(n_muestra, total) - cuotas.sum())
+    if faltantes > 0:
+        orden = (exactas - cuotas).sort_values(ascending=False).index[:faltantes]
+        cuotas[orden] += 1
+    return cuotas
+
+
+def muestreo_estratificado(nombre_archivo, n_muestra=5_000, estratos=('Default',), semilla=21, tamano_bloque=50_000,
+                           filtro=None):
+    """
+    Muestra estratificada de n_muestra filas en una sola pasada sobre el archivo (reservorio por estrato).
+    Cada fila recibe una clave aleatoria uniforme y por estrato se conservan las n_muestra claves menores,
+    por lo que la memoria queda acotada por n_muestra x número de estratos, independiente del tamaño del archivo.
+    Al final se asigna a cada estrato una cuota proporcional a su tamaño observado.
+    Con la misma semilla y tamano_bloque la muestra es reproducible.
+    `filtro(bloque, indice_bloque)` restringe las filas candidatas (p. ej. solo el train de particionar_bloque).
+    """
+    estratos = list(estratos)
+    rng = np.random.default_rng(semilla)
+    reservorio = None
+    conteos = None
+
+    for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+        if filtro is not None:
+            bloque = filtro(bloque, i)
+            if bloque.empty:
+                continue
+        bloque = bloque.assign(_clave=rng.random(len(bloque)))
+
+        conteo_bloque = bloque.groupby(estratos, dropna=False).size()
+        conteos = conteo_bloque if conteos is None else conteos.add(conteo_bloque, fill_value=0)
+
+        candidatos = bloque if reservorio is None else pd.concat([reservorio, bloque], ignore_index=True)
+        reservorio = (
+            candidatos.sort_values('_clave')
+            .groupby(estratos, dropna=False, sort=False)
+            .head(n_muestra)
+        )
+
+    if reservorio is None:
+        raise ValueError("El archivo no contiene filas.")
+
+    cuotas = _asignar_cuotas(conteos.astype(int), n_muestra)
+    reservorio = reservorio.sort_values('_clave')
+    rango = reservorio.groupby(estratos, dropna=False, sort=False).cumcount()
+    cuota_fila = reservorio.set_index(estratos).index.map(cuotas).to_numpy()
+    muestra = reservorio[rango.to_numpy() < cuota_fila]
+
+    return muestra.drop(columns='_clave').reset_index(drop=True)
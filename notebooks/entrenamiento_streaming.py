@@ -0,0 +1,183 @@
+# entrenamiento_streaming.py
+# Entrenamiento fuera de memoria (out-of-core): lectura por bloques + SGD logístico con partial_fit.
+# Genera artefactos compatibles con cargar_artefactos (model.pkl / encoder.pkl).
+
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from datos_streaming import leer_por_bloques, muestreo_estratificado, particionar_bloque
+from evaluacion_streaming import evaluar_histograma_por_f1, histograma_desde_bloques
+from modelamiento_fraude import CANDIDATOS, guardar_artefactos
+
+# El codificador vive en src/ para que la API pueda deserializarlo.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from codificador_target import CodificadorTarget  # noqa: E402
+
+
+# --- Pasada 1: estadísticas del target ---
+def ajustar_codificador_streaming(nombre_archivo, tamano_bloque=50_000, columna='Nivel_Educacional',
+                                  semilla=21, fraccion_test=0.3):
+    """Primera pasada: acumula las estadísticas del target por categoría y el conteo por clase."""
+    codificador = CodificadorTarget(columna=columna)
+    conteo_clases = {0: 0, 1: 0}
+
+    for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+        train, _ = particionar_bloque(bloque, i, semilla, fraccion_test)
+        codificador.actualizar(train.drop('Default', axis=1), train['Default'])
+        for clase, n in train['Default'].value_counts().items():
+            conteo_clases[int(clase)] += int(n)
+
+    return codificador.finalizar(), conteo_clases
+
+
+# --- Pasada 2: escalado ---
+def ajustar_escalador_streaming(nombre_archivo, codificador, tamano_bloque=50_000, semilla=21, fraccion_test=0.3):
+    """Segunda pasada: media y varianza de las variables codificadas (StandardScaler.partial_fit)."""
+    escalador = StandardScaler()
+    for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+        train, _ = particionar_bloque(bloque, i, semilla, fraccion_test)
+        escalador.partial_fit(codificador.transform(train.drop('Default', axis=1)))
+    return escalador
+
+
+# --- Entrenamiento SGD ---
+def entrenar_logit_streaming(nombre_archivo, tamano_bloque=50_000, epocas=5, semilla=21, fraccion_test=0.3):
+    """
+    Entrena una regresión logística (SGDClassifier con log_loss) sin cargar el dataset en memoria.
+    Replica la configuración del logit de entrenar_modelos en lo posible: pesos de clase 'balanced' (calculados
+    en la primera pasada, ya que partial_fit no acepta 'balanced') y penalización L2 débil (alpha = 1 / n_train).
+    Como el SGD se ajusta sobre variables estandarizadas, sus coeficientes no son idénticos a los del logit.
+    Devuelve (modelo, codificador), ambos serializables con guardar_artefactos.
+    """
+    codificador, conteo_clases = ajustar_codificador_streaming(
+        nombre_archivo, tamano_bloque, semilla=semilla, fraccion_test=fraccion_test
+    )
+    escalador = ajustar_escalador_streaming(nombre_archivo, codificador, tamano_bloque, semilla, fraccion_test)
+
+    n_train = sum(conteo_clases.values())
+    pesos_clase = {clase: n_train / (2 * n) for clase, n in conteo_clases.items() if n > 0}
+
+    sgd = SGDClassifier(
+        loss='log_loss',
+        alpha=1.0 / n_train,
+        class_weight=pesos_clase,
+        learning_rate='adaptive',
+        eta0=0.01,
+        average=True,  # SGD promediado: converge mucho más cerca de la solución exacta
+        random_state=semilla,
+    )
+    rng = np.random.default_rng(semilla)
+
+    for epoca in range(epocas):
+        for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+            train, _ = particionar_bloque(bloque, i, semilla, fraccion_test)
+            if train.empty:
+                continue
+            # Barajamos las filas del bloque en cada época
+            train = train.iloc[rng.permutation(len(train))]
+            X = escalador.transform(codificador.transform(train.drop('Default', axis=1)))
+            sgd.partial_fit(X, train['Default'].to_numpy(), classes=np.array([0, 1]))
+        print(f"  Época {epoca + 1}/{epocas} completada")
+
+    # El Pipeline expone predict_proba/predict igual que el LogisticRegression original
+    modelo = Pipeline([('escalador', escalador), ('sgd', sgd)])
+    return modelo, codificador
+
+
+# --- Paridad con el logit en memoria ---
+def reportar_paridad(modelo_stream, codificador_stream, modelo_ref, encoder_ref, nombre_archivo,
+                     tamano_bloque=50_000, semilla=21, fraccion_test=0.3):
+    """Compara, bloque a bloque sobre el test, las probabilidades del modelo streaming con un logit de referencia."""
+    n = 0
+    suma_dif = 0.0
+    dif_max = 0.0
+    concordancia = 0
+
+    for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+        _, test = particionar_bloque(bloque, i, semilla, fraccion_test)
+        if test.empty:
+            continue
+        X = test.drop('Default', axis=1)
+        p_stream = modelo_stream.predict_proba(codificador_stream.transform(X))[:, 1]
+        p_ref = modelo_ref.predict_proba(encoder_ref.transform(X))[:, 1]
+
+        dif = np.abs(p_stream - p_ref)
+        n += len(dif)
+        suma_dif += float(dif.sum())
+        dif_max = max(dif_max, float(dif.max()))
+        concordancia += int(((p_stream >= 0.5) == (p_ref >= 0.5)).sum())
+
+    paridad = {
+        'Filas_Test': n,
+        'Dif_Media_Prob': suma_dif / n if n else float('nan'),
+        'Dif_Max_Prob': dif_max,
+        'Concordancia_Clase': concordancia / n if n else float('nan'),
+    }
+
+    print("\n⚖️ Paridad SGD streaming vs Logit en memoria:")
+    print(f"Filas test: {paridad['Filas_Test']} | Dif. media prob: {paridad['Dif_Media_Prob']:.4f} | "
+          f"Dif. máx prob: {paridad['Dif_Max_Prob']:.4f} | Concordancia de clase: {paridad['Concordancia_Clase']:.4f}")
+    return paridad
+
+
+# --- Puntaje del test por bloques ---
+def puntuar_test_por_bloques(modelo, codificador, nombre_archivo, tamano_bloque=50_000, semilla=21, fraccion_test=0.3):
+    """Genera pares (y, probs) de la partición de test, bloque a bloque (para evaluar_histograma_por_f1)."""
+    for i, bloque in enumerate(leer_por_bloques(nombre_archivo, tamano_bloque)):
+        _, test = particionar_bloque(bloque, i, semilla, fraccion_test)
+        if test.empty:
+            continue
+        X = codificador.transform(test.drop('Default', axis=1))
+        yield test['Default'].to_numpy(), modelo.predict_proba(X)[:, 1]
+
+
+# --- Main ---
+def main(nombre_archivo="./Tabla Trabajo Grupal N°2.xlsx", tamano_bloque=2_000, epocas=5, n_muestra_referencia=5_000):
+    # 1. Entrenamiento streaming (memoria acotada por tamano_bloque)
+    print(f"🌊 Entrenamiento streaming con bloques de {tamano_bloque} filas...")
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    modelo_stream, codificador_stream = entrenar_logit_streaming(nombre_archivo, tamano_bloque, epocas)
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"⏱️ Tiempo: {duracion:.2f}s | Pico de memoria (tracemalloc): {pico / 1e6:.1f} MB")
+
+    # 2. Métricas del test desde histogramas (sin cargar el test en memoria)
+    histograma = histograma_desde_bloques(
+        puntuar_test_por_bloques(modelo_stream, codificador_stream, nombre_archivo, tamano_bloque)
+    )
+    evaluar_histograma_por_f1(histograma, 'Test', 'sgd_streaming')
+
+    # 3. Paridad con un logit de referencia ajustado en memoria sobre una muestra estratificada del train
+    # (n_muestra_referencia=None la omite; la memoria queda acotada por el tamaño de la muestra).
+    # La muestra sale solo de las filas de train de particionar_bloque: ambos modelos se evalúan y comparan
+    # sobre el mismo test, que ninguno de los dos vio al entrenar.
+    if n_muestra_referencia:
+        muestra = muestreo_estratificado(nombre_archivo, n_muestra_referencia, tamano_bloque=tamano_bloque,
+                                         filtro=lambda bloque, i: particionar_bloque(bloque, i)[0])
+        X_muestra = muestra.drop('Default', axis=1)
+        encoder = CodificadorTarget().fit(X_muestra, muestra['Default'])
+        clase, parametros = CANDIDATOS['logit_sk']
+        modelo_logit = clase(**parametros).fit(encoder.transform(X_muestra), muestra['Default'])
+
+        histograma = histograma_desde_bloques(
+            puntuar_test_por_bloques(modelo_logit, encoder, nombre_archivo, tamano_bloque)
+        )
+        evaluar_histograma_por_f1(histograma, 'Test', f'logit_sk (muestra de {len(muestra)} filas)')
+        reportar_paridad(modelo_stream, codificador_stream, modelo_logit, encoder, nombre_archivo, tamano_bloque)
+
+    # 4. Serialización
+    guardar_artefactos(modelo_stream, codificador_stream,
+                       nombre_modelo='model_streaming.pkl', nombre_encoder='encoder_streaming.pkl')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# evaluacion_streaming.py
+# Evaluación fuera de memoria: histogramas de puntajes por clase, combinables entre workers.
+# AUC, KS, umbral óptimo por F1 y matriz de confusión se calculan desde los histogramas.
+
+import os
+import sys
+import pickle
+import numpy as np
+import pandas as pd
+
+from datos_streaming import leer_por_bloques, resolver_ruta
+
+
+# --- Histograma de puntajes por clase ---
+class HistogramaPuntajes:
+    """
+    Conteo de puntajes (probabilidades en [0, 1]) en n_bins intervalos de igual ancho, separado por clase.
+    El umbral del bin k es k / n_bins: una fila se predice positiva si prob >= k / n_bins.
+    Dos histogramas con la misma resolución se combinan sumando sus conteos (resultados de varios workers).
+    """
+
+    def __init__(self, n_bins=10_000):
+        self.n_bins = n_bins
+        self.positivos = np.zeros(n_bins, dtype=np.int64)
+        self.negativos = np.zeros(n_bins, dtype=np.int64)
+
+    def actualizar(self, y, probs):
+        """Agrega un bloque de etiquetas reales y probabilidades puntuadas."""
+        y = np.asarray(y).astype(bool)
+        bins = np.clip((np.asarray(probs, dtype=float) * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.positivos += np.bincount(bins[y], minlength=self.n_bins)
+        self.negativos += np.bincount(bins[~y], minlength=self.n_bins)
+        return self
+
+    def combinar(self, otro):
+        """Suma los conteos de otro histograma (misma resolución)."""
+        if otro.n_bins != self.n_bins:
+            raise ValueError(f"Resoluciones distintas: {self.n_bins} vs {otro.n_bins} bins.")
+        self.positivos += otro.positivos
+        self.negativos += otro.negativos
+        return self
+
+    # --- Persistencia (intercambio entre workers) ---
+    def guardar(self, ruta):
+        np.savez_compressed(ruta, positivos=self.positivos, negativos=self.negativos)
+
+    @classmethod
+    def cargar(cls, ruta):
+        datos = np.load(ruta)
+        histograma = cls(n_bins=len(datos['positivos']))
+        histograma.positivos += datos['positivos']
+        histograma.negativos += datos['negativos']
+        return histograma
+
+    # --- Métricas ---
+    def curva(self):
+        """Devuelve (umbrales, tp, fp) para cada umbral k / n_bins, de mayor a menor sensibilidad."""
+        tp = np.cumsum(self.positivos[::-1])[::-1]
+        fp = np.cumsum(self.negativos[::-1])[::-1]
+        umbrales = np.arange(self.n_bins) / self.n_bins
+        return umbrales, tp, fp
+
+    def metricas(self):
+        """AUC, KS, umbral óptimo por F1 y métricas asociadas, con la cota de error del AUC."""
+        umbrales, tp, fp = self.curva()
+        P, N = int(tp[0]), int(fp[0])
+        if P == 0 or N == 0:
+            raise ValueError("Se necesitan ambas clases para calcular las métricas.")
+
+        # ROC: agregamos el punto (0, 0) correspondiente a "ninguna fila positiva"
+        tpr = np.append(tp, 0) / P
+        fpr = np.append(fp, 0) / N
+        auc = float(np.sum((fpr[:-1] - fpr[1:]) * (tpr[:-1] + tpr[1:]) / 2))
+        ks = float(np.max(tpr - fpr))
+        # Los pares (positivo, negativo) que caen en el mismo bin son los únicos que pueden estar mal ordenados
+        error_auc = float(np.sum(self.positivos * self.negativos.astype(float)) / (2 * P * N))
+
+        fn = P - tp
+        f1_scores = 2 * tp / np.maximum(2 * tp + fp + fn, 1)
+        idx_max = int(np.argmax(f1_scores))
+
+        tp_o, fp_o, fn_o = int(tp[idx_max]), int(fp[idx_max]), int(fn[idx_max])
+        tn_o = N - fp_o
+        return {
+            'AUC': auc,
+            'KS': ks,
+            'Threshold': float(umbrales[idx_max]),
+            'Accuracy': (tp_o + tn_o) / (P + N),
+            'Precision': tp_o / (tp_o + fp_o) if tp_o + fp_o else 0.0,
+            'Recall': tp_o / P,
+            'F1': float(f1_scores[idx_max]),
+            'Error_AUC_Max': error_auc,
+            'Matriz_Confusion': np.array([[tn_o, fp_o], [fn_o, tp_o]]),
+        }
+
+
+# --- Construcción de histogramas ---
+def histograma_desde_bloques(bloques_puntuados, n_bins=10_000):
+    """Construye un histograma a partir de un iterable de pares (y, probs)."""
+    histograma = HistogramaPuntajes(n_bins)
+    for y, probs in bloques_puntuados:
+        histograma.actualizar(y, probs)
+    return histograma
+
+
+def histograma_desde_archivo_puntuado(nombre_archivo, columna_y='Default', columna_prob='probability_default',
+                                      n_bins=10_000, tamano_bloque=500_000):
+    """Construye el histograma desde un CSV ya puntuado (salida del scoring offline), leyéndolo por bloques."""
+    ruta = resolver_ruta(nombre_archivo)
+    histograma = HistogramaPuntajes(n_bins)
+    for bloque in pd.read_csv(ruta, usecols=[columna_y, columna_prob], chunksize=tamano_bloque):
+        histograma.actualizar(bloque[columna_y].to_numpy(), bloque[columna_prob].to_numpy())
+    return histograma
+
+
+def puntuar_por_bloques(modelo, encoder, nombre_archivo, tamano_bloque=50_000):
+    """Puntúa el dataset bloque a bloque con el modelo y encoder desplegados; genera pares (y, probs)."""
+    for bloque in leer_por_bloques(nombre_archivo, tamano_bloque):
+        X_encoded = encoder.transform(bloque.drop('Default', axis=1))
+        yield bloque['Default'].to_numpy(), modelo.predict_proba(X_encoded)[:, 1]
+
+
+def combinar_histogramas(histogramas):
+    """Combina los histogramas (objetos o rutas .npz) de varios workers en uno solo."""
+    total = None
+    for h in histogramas:
+        h = HistogramaPuntajes.cargar(h) if isinstance(h, (str, os.PathLike)) else h
+        total = HistogramaPuntajes(h.n_bins).combinar(h) if total is None else total.combinar(h)
+    if total is None:
+        raise ValueError("No se recibieron histogramas para combinar.")
+    return total
+
+
+# --- Evaluación por F1 desde histogramas (mismo formato que evaluar_modelo_por_f1) ---
+def evaluar_histograma_por_f1(histograma, muestra, tipo):
+    m = histograma.metricas()
+
+    print(f"\n📊 {tipo.upper()} - {muestra.upper()} (histograma, {histograma.n_bins} bins)")
+    print(f"AUC: {m['AUC']:.4f} (±{m['Error_AUC_Max']:.4f}) | KS: {m['KS']:.4f} | Threshold óptimo (F1): {m['Threshold']:.4f}")
+    print(f"Accuracy: {m['Accuracy']:.4f} | Precision: {m['Precision']:.4f} | Recall: {m['Recall']:.4f} | F1: {m['F1']:.4f}")
+    print("Matriz de Confusión:")
+    print(m['Matriz_Confusion'])
+
+    return {
+        'Modelo': tipo,
+        'Muestra': muestra,
+        'AUC': m['AUC'],
+        'KS': m['KS'],
+        'Threshold': m['Threshold'],
+        'Accuracy': m['Accuracy'],
+        'Precision': m['Precision'],
+        'Recall': m['Recall'],
+        'F1': m['F1']
+    }
+
+
+# --- Main ---
+def main(nombre_archivo="./Tabla Trabajo Grupal N°2.xlsx", tamano_bloque=2_000, n_bins=10_000):
+    # Artefactos desplegados (misma carga que la API)
+    ruta_base = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(os.path.join(ruta_base, '..', 'src'))
+    with open(os.path.join(ruta_base, '..', 'model', 'model.pkl'), 'rb') as file:
+        modelo = pickle.load(file)
+    with open(os.path.join(ruta_base, '..', 'model', 'encoder.pkl'), 'rb') as file:
+        encoder = pickle.load(file)
+
+    # Simulamos dos workers (bloques pares e impares) y combinamos sus histogramas
+    workers = [HistogramaPuntajes(n_bins), HistogramaPuntajes(n_bins)]
+    for i, (y, probs) in enumerate(puntuar_por_bloques(modelo, encoder, nombre_archivo, tamano_bloque)):
+        workers[i % 2].actualizar(y, probs)
+
+    histograma = combinar_histogramas(workers)
+    evaluar_histograma_por_f1(histograma, 'Completa', 'logit_sk')
+
+
+if __name__ == "__main__":
+    main()
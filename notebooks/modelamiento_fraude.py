@@ -4,7 +4,10 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import time
 import pickle  # Necesario para guardar los modelos (.pkl)
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Reemplazamos statsmodels con la versión de Scikit-learn (fácil de serializar)
 from sklearn.linear_model import LogisticRegression
@@ -14,7 +17,13 @@ from sklearn.metrics import (
     roc_curve, roc_auc_score, f1_score, confusion_matrix,
     accuracy_score, precision_score, recall_score
 )
-from category_encoders import TargetEncoder
+
+from datos_streaming import muestreo_estratificado
+from bootstrap_metricas import intervalos_bootstrap
+
+# El codificador vive en src/ para que la API pueda deserializarlo.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from codificador_target import CodificadorTarget  # noqa: E402
 
 # Para visualización (opcional, puede causar problemas si no hay entorno gráfico)
 import matplotlib.pyplot as plt
@@ -39,32 +48,46 @@ def cargar_datos(nombre_archivo):
 
 
 # --- Codificación (Devuelve el encoder entrenado) ---
-def codificar_target(df_train, df_test, columna='Nivel_Educacional'):
-    # Creamos el encoder de Target
-    encoder = TargetEncoder(cols=[columna])
-    # fit solo con los datos de entrenamiento
-    encoder.fit(df_train.drop('Default', axis=1), df_train['Default']) 
-    
-    X_train_encoded = encoder.transform(df_train.drop('Default', axis=1))
-    X_test_encoded = encoder.transform(df_test.drop('Default', axis=1))
+def codificar_target(df_train, df_test, columna='Nivel_Educacional', n_pliegues=None, semilla=21):
+    # Creamos el encoder de Target (nativo, mismos valores que category_encoders.TargetEncoder)
+    encoder = CodificadorTarget(columna=columna)
+    # drop() ya devuelve una copia: la columna se codifica en el mismo DataFrame
+    X_train = df_train.drop('Default', axis=1)
+    X_test = df_test.drop('Default', axis=1)
+
+    if n_pliegues is None:
+        # fit solo con los datos de entrenamiento
+        encoder.fit(X_train, df_train['Default'])
+        X_train_encoded = encoder.transform(X_train, inplace=True)
+    else:
+        # Train codificado fuera de pliegue; el encoder final (test / despliegue) usa todo el train
+        X_train_encoded = encoder.ajustar_transformar_oof(X_train, df_train['Default'], n_pliegues, semilla, inplace=True)
+    X_test_encoded = encoder.transform(X_test, inplace=True)
     
     # Devolvemos el encoder para guardarlo en .pkl
     return X_train_encoded, X_test_encoded, encoder 
 
 
+# --- Modelos candidatos ---
+# nombre -> (clase, parámetros). Para evaluar otro modelo en el pipeline basta con agregarlo aquí
+# (o pasar un diccionario propio a pipeline_modelos / main). Clase y parámetros deben poder serializarse (procesos).
+CANDIDATOS = {
+    # Usamos 'class_weight=balanced' ya que el dataset está desbalanceado.
+    'logit_sk': (LogisticRegression, {'random_state': 21, 'max_iter': 1000, 'class_weight': 'balanced'}),
+    'tree': (DecisionTreeClassifier, {'max_depth': 4, 'min_samples_leaf': 75, 'random_state': 21}),
+}
+
+
 # --- Entrenamiento de modelos (Ambos Scikit-learn) ---
 def entrenar_modelos(X_train_encoded, y_train):
     # Modelo 1: Árbol de Decisión
-    tree_model = DecisionTreeClassifier(max_depth=4, min_samples_leaf=75, random_state=21)
+    clase, parametros = CANDIDATOS['tree']
+    tree_model = clase(**parametros)
     tree_model.fit(X_train_encoded, y_train)
 
     # Modelo 2: Regresión Logística de Scikit-learn
-    # Usamos 'class_weight=balanced' ya que el dataset está desbalanceado.
-    modelo_logit_sklearn = LogisticRegression(
-        random_state=21, 
-        max_iter=1000, 
-        class_weight='balanced' 
-    ) 
+    clase, parametros = CANDIDATOS['logit_sk']
+    modelo_logit_sklearn = clase(**parametros)
     modelo_logit_sklearn.fit(X_train_encoded, y_train)
 
     # Devolvemos ambos modelos de Scikit-learn
@@ -74,7 +97,13 @@ def entrenar_modelos(X_train_encoded, y_train):
 def evaluar_modelo_por_f1(modelo, X, y, muestra, tipo):
     # Ambos modelos de sklearn usan predict_proba
     probs = modelo.predict_proba(X)[:, 1]
+    resultado = evaluar_puntajes_por_f1(probs, y, muestra, tipo)
+    imprimir_evaluacion(resultado)
+    return {clave: valor for clave, valor in resultado.items() if clave not in ('Matriz_Confusion', 'Curva_ROC')}
 
+
+def evaluar_puntajes_por_f1(probs, y, muestra, tipo):
+    """Métricas de evaluar_modelo_por_f1 a partir de puntajes ya calculados (incluye matriz de confusión y curva ROC)."""
     fpr, tpr, thresholds = roc_curve(y, probs)
     auc = roc_auc_score(y, probs)
     ks = max(tpr - fpr)
@@ -91,12 +120,6 @@ def evaluar_modelo_por_f1(modelo, X, y, muestra, tipo):
     f1 = f1_score(y, pred_class)
     cm = confusion_matrix(y, pred_class)
 
-    print(f"\n📊 {tipo.upper()} - {muestra.upper()}")
-    print(f"AUC: {auc:.4f} | KS: {ks:.4f} | Threshold óptimo (F1): {threshold_optimo:.4f}")
-    print(f"Accuracy: {acc:.4f} | Precision: {prec:.4f} | Recall: {rec:.4f} | F1: {f1:.4f}")
-    print("Matriz de Confusión:")
-    print(cm)
-
     return {
         'Modelo': tipo,
         'Muestra': muestra,
@@ -106,9 +129,20 @@ def evaluar_modelo_por_f1(modelo, X, y, muestra, tipo):
         'Accuracy': acc,
         'Precision': prec,
         'Recall': rec,
-        'F1': f1
+        'F1': f1,
+        'Matriz_Confusion': cm,
+        'Curva_ROC': (fpr, tpr),
     }
 
+
+def imprimir_evaluacion(resultado):
+    print(f"\n📊 {resultado['Modelo'].upper()} - {resultado['Muestra'].upper()}")
+    print(f"AUC: {resultado['AUC']:.4f} | KS: {resultado['KS']:.4f} | Threshold óptimo (F1): {resultado['Threshold']:.4f}")
+    print(f"Accuracy: {resultado['Accuracy']:.4f} | Precision: {resultado['Precision']:.4f} | "
+          f"Recall: {resultado['Recall']:.4f} | F1: {resultado['F1']:.4f}")
+    print("Matriz de Confusión:")
+    print(resultado['Matriz_Confusion'])
+
 # --- Visualización ROC ---
 def graficar_roc(modelo_logit, tree_model, X_train_encoded, X_test_encoded, y_train, y_test, metricas):
     plt.figure(figsize=(10, 6))
@@ -143,44 +177,163 @@ def guardar_artefactos(modelo_a_desplegar, encoder, nombre_modelo='model.pkl', n
         pickle.dump(modelo_a_desplegar, file)
     print(f"✅ Modelo para despliegue guardado como: {nombre_modelo}")
     
-    # Guardar el Codificador (TargetEncoder)
+    # Guardar el Codificador (CodificadorTarget)
     with open(nombre_encoder, 'wb') as file:
         pickle.dump(encoder, file)
-    print(f"✅ Codificador (TargetEncoder) guardado como: {nombre_encoder}")
+    print(f"✅ Codificador (CodificadorTarget) guardado como: {nombre_encoder}")
+
+
+# --- Pipeline paralelo de candidatos (caché de puntajes) ---
+def _entrenar_y_puntuar(nombre, clase, parametros, X_train, X_test, y_train):
+    """Worker: entrena un candidato y puntúa Train y Test una sola vez."""
+    inicio = time.perf_counter()
+    modelo = clase(**parametros).fit(X_train, y_train)
+    entrenamiento = time.perf_counter() - inicio
+    puntajes = {'Train': modelo.predict_proba(X_train)[:, 1], 'Test': modelo.predict_proba(X_test)[:, 1]}
+    return nombre, modelo, puntajes, entrenamiento, time.perf_counter() - inicio - entrenamiento
+
+
+def _evaluar_desde_cache(argumentos):
+    """Worker: métricas por F1 y curva ROC de un par (modelo, muestra) desde sus puntajes."""
+    probs, y, muestra, tipo = argumentos
+    inicio = time.perf_counter()
+    resultado = evaluar_puntajes_por_f1(probs, y, muestra, tipo)
+    return resultado, time.perf_counter() - inicio
+
+
+def pipeline_modelos(X_train, X_test, y_train, y_test, candidatos=None, n_procesos=None):
+    """
+    Entrena los candidatos en paralelo (procesos) y puntúa cada par (modelo, muestra) una sola vez en la caché
+    {(modelo, muestra): probs}. La evaluación por F1 y las curvas ROC se calculan en paralelo desde la caché.
+    Devuelve (modelos, cache, resultados, tiempos); tiempos tiene el costo de reloj de cada candidato.
+    """
+    candidatos = CANDIDATOS if candidatos is None else candidatos
+    n_procesos = n_procesos or min(2 * len(candidatos), os.cpu_count() or 1)
+    y_por_muestra = {'Train': np.asarray(y_train), 'Test': np.asarray(y_test)}
+    modelos, cache = {}, {}
+    tiempos = {nombre: {'Modelo': nombre} for nombre in candidatos}
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        futuros = [pool.submit(_entrenar_y_puntuar, nombre, clase, parametros, X_train, X_test, y_train)
+                   for nombre, (clase, parametros) in candidatos.items()]
+        for futuro in as_completed(futuros):
+            nombre, modelo, puntajes, segundos_entrenamiento, segundos_puntaje = futuro.result()
+            modelos[nombre] = modelo
+            cache.update({(nombre, muestra): probs for muestra, probs in puntajes.items()})
+            tiempos[nombre].update({'Entrenamiento_s': segundos_entrenamiento, 'Puntaje_s': segundos_puntaje})
+
+        pares = [(nombre, muestra) for nombre in candidatos for muestra in ('Train', 'Test')]
+        evaluaciones = pool.map(_evaluar_desde_cache,
+                                [(cache[(nombre, muestra)], y_por_muestra[muestra], muestra, nombre)
+                                 for nombre, muestra in pares])
+        resultados = []
+        for resultado, segundos in evaluaciones:
+            resultados.append(resultado)
+            tiempos[resultado['Modelo']]['Evaluacion_s'] = tiempos[resultado['Modelo']].get('Evaluacion_s', 0.0) + segundos
+
+    tiempos = pd.DataFrame(tiempos.values())
+    tiempos['Total_s'] = tiempos[['Entrenamiento_s', 'Puntaje_s', 'Evaluacion_s']].sum(axis=1)
+    tiempos.attrs['reloj_total_s'] = time.perf_counter() - inicio
+    return modelos, cache, resultados, tiempos
+
+
+def graficar_roc_desde_cache(resultados):
+    """Curvas ROC ya calculadas por evaluar_puntajes_por_f1 (sin volver a puntuar)."""
+    plt.figure(figsize=(10, 6))
+    for resultado in resultados:
+        fpr, tpr = resultado['Curva_ROC']
+        plt.plot(fpr, tpr, label=f'{resultado["Modelo"].upper()} {resultado["Muestra"]} (AUC={resultado["AUC"]:.2f})')
+
+    plt.plot([0, 1], [0, 1], 'k--', alpha=0.5)
+    plt.xlabel('FPR (Tasa de Falsos Positivos)')
+    plt.ylabel('TPR (Tasa de Verdaderos Positivos)')
+    plt.title('Curvas ROC - Comparación de Modelos')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+def elegir_campeon(metricas, metrica='F1', muestra='Test'):
+    """Nombre del modelo con mejor `metrica` en `muestra`."""
+    candidatos = [m for m in metricas if m['Muestra'] == muestra]
+    return max(candidatos, key=lambda m: m[metrica])['Modelo']
 
 
 # --- Main (COMPLETO) ---
-def main():
+def main(n_muestra=None, estratos=('Default',), semilla=21, n_bootstrap=2000, n_pliegues=None,
+         pipeline=False, candidatos=None, n_procesos=None, metrica_campeon='F1'):
     # 1. Carga, división y Codificación
     # Asegúrate de que "Tabla Trabajo Grupal N°2.xlsx" está en el mismo directorio
-    df = cargar_datos("./Tabla Trabajo Grupal N°2.xlsx")
+    # Con n_muestra se trabaja sobre una muestra estratificada (una pasada, sin cargar el archivo completo)
+    if n_muestra is None:
+        df = cargar_datos("./Tabla Trabajo Grupal N°2.xlsx")
+    else:
+        df = muestreo_estratificado("./Tabla Trabajo Grupal N°2.xlsx", n_muestra, estratos, semilla)
     df_train, df_test = train_test_split(df, test_size=0.3, random_state=21)
     
-    # Recibimos también el encoder
-    X_train_encoded, X_test_encoded, encoder = codificar_target(df_train, df_test)
+    # Recibimos también el encoder (con n_pliegues, el train se codifica fuera de pliegue)
+    X_train_encoded, X_test_encoded, encoder = codificar_target(df_train, df_test, n_pliegues=n_pliegues, semilla=semilla)
     y_train = df_train['Default']
     y_test = df_test['Default']
 
-    # 2. Entrenamiento
-    modelo_logit, tree_model = entrenar_modelos(X_train_encoded, y_train)
+    if pipeline:
+        # 2-3. Entrenamiento y evaluación en paralelo: cada (modelo, muestra) se puntúa una sola vez
+        modelos, cache, resultados, tiempos = pipeline_modelos(
+            X_train_encoded, X_test_encoded, y_train, y_test, candidatos, n_procesos
+        )
+        for resultado in resultados:
+            imprimir_evaluacion(resultado)
+        graficar_roc_desde_cache(resultados)
+        metricas = [{clave: valor for clave, valor in r.items() if clave not in ('Matriz_Confusion', 'Curva_ROC')}
+                    for r in resultados]
+
+        print(f"\n⏱️ Tiempo de reloj por candidato (pipeline total: {tiempos.attrs['reloj_total_s']:.2f} s, "
+              f"suma secuencial: {tiempos['Total_s'].sum():.2f} s):")
+        print(tiempos.to_string(index=False, float_format='{:.3f}'.format))
+    else:
+        # 2. Entrenamiento
+        modelo_logit, tree_model = entrenar_modelos(X_train_encoded, y_train)
+        modelos = {'logit_sk': modelo_logit, 'tree': tree_model}
 
-    # 3. Evaluación (Muestra las métricas para la decisión)
-    metricas = []
-    # Usamos 'logit_sk' 
-    for modelo, tipo in [(modelo_logit, 'logit_sk'), (tree_model, 'tree')]:
-        for X, y, muestra in [(X_train_encoded, y_train, 'Train'), (X_test_encoded, y_test, 'Test')]:
-            resultado = evaluar_modelo_por_f1(modelo, X, y, muestra, tipo)
-            metricas.append(resultado)
+        # 3. Evaluación (Muestra las métricas para la decisión)
+        metricas = []
+        # Usamos 'logit_sk' 
+        for modelo, tipo in [(modelo_logit, 'logit_sk'), (tree_model, 'tree')]:
+            for X, y, muestra in [(X_train_encoded, y_train, 'Train'), (X_test_encoded, y_test, 'Test')]:
+                resultado = evaluar_modelo_por_f1(modelo, X, y, muestra, tipo)
+                metricas.append(resultado)
 
-    graficar_roc(modelo_logit, tree_model, X_train_encoded, X_test_encoded, y_train, y_test, metricas)
+        graficar_roc(modelo_logit, tree_model, X_train_encoded, X_test_encoded, y_train, y_test, metricas)
+
+        # Los modelos se puntúan una sola vez por muestra para el bootstrap
+        cache = {(tipo, muestra): modelo.predict_proba(X)[:, 1]
+                 for tipo, modelo in modelos.items()
+                 for X, muestra in [(X_train_encoded, 'Train'), (X_test_encoded, 'Test')]}
 
     metricas_df = pd.DataFrame(metricas)
     print("\n📋 Comparación de modelos:")
     print(metricas_df)
+
+    # Intervalos de confianza bootstrap (desde los puntajes ya calculados)
+    if n_bootstrap:
+        intervalos = []
+        for y, muestra in [(y_train, 'Train'), (y_test, 'Test')]:
+            scores = {tipo: cache[(tipo, muestra)] for tipo in modelos}
+            intervalos.append(intervalos_bootstrap(y, scores, muestra, n_replicas=n_bootstrap, semilla=semilla))
+        print(f"\n📐 Intervalos de confianza bootstrap al 95% ({n_bootstrap} réplicas):")
+        print(pd.concat(intervalos, ignore_index=True).to_string(index=False, float_format='{:.4f}'.format))
     
-    # 4. Serialización (Elegimos el Logit ya que tuvo mejor AUC/F1 en la evaluación anterior)
-    print("\n📦 Serializando el modelo de Regresión Logística (Logit_sk) y el Codificador...")
-    guardar_artefactos(modelo_logit, encoder, nombre_modelo='model.pkl', nombre_encoder='encoder.pkl')
+    # 4. Serialización
+    if pipeline:
+        # El campeón se elige automáticamente por la métrica indicada en Test
+        campeon = elegir_campeon(metricas, metrica_campeon)
+        print(f"\n📦 Serializando el campeón por {metrica_campeon} en Test ({campeon}) y el Codificador...")
+        guardar_artefactos(modelos[campeon], encoder, nombre_modelo='model.pkl', nombre_encoder='encoder.pkl')
+    else:
+        # Elegimos el Logit ya que tuvo mejor AUC/F1 en la evaluación anterior
+        print("\n📦 Serializando el modelo de Regresión Logística (Logit_sk) y el Codificador...")
+        guardar_artefactos(modelo_logit, encoder, nombre_modelo='model.pkl', nombre_encoder='encoder.pkl')
 
 
 if __name__ == "__main__":
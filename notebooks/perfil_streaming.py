@@ -0,0 +1,344 @@
+# perfil_streaming.py
+# Perfilamiento exploratorio (AED) en una sola pasada por bloques, para datasets más grandes que la memoria.
+# Calcula conteos, media y varianza (Welford/Chan), histogramas y cuantiles aproximados, separaciones por Default,
+# conteos de categorías y la matriz de correlación. Las figuras se generan sin pantalla (Agg) y en paralelo.
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from datos_streaming import leer_por_bloques
+
+VARIABLES_NUMERICAS = [
+    'Edad', 'Años_Trabajando', 'Ingresos', 'Deuda_Comercial',
+    'Deuda_Credito', 'Otras_Deudas', 'Ratio_Ingresos_Deudas'
+]
+VARIABLES_CATEGORICAS = ['Nivel_Educacional']
+VARIABLE_OBJETIVO = 'Default'
+
+
+# --- Combinación de momentos (Chan et al., generalización de Welford por bloques) ---
+def _combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """Combina (n, media, M2) de dos conjuntos; opera elemento a elemento sobre arreglos."""
+    n = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = media_b - media_a
+        media = np.where(n > 0, media_a + delta * n_b / np.maximum(n, 1), 0.0)
+        m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / np.maximum(n, 1)
+    return n, media, np.where(n > 0, m2, 0.0)
+
+
+# --- Histograma de rango adaptativo ---
+class HistogramaAdaptativo:
+    """
+    Histograma de n_bins de igual ancho que se amplía en una pasada: si llega un valor fuera de rango,
+    se duplica el ancho fusionando pares de bins (los conteos siguen siendo exactos para la nueva grilla).
+    Guarda una fila de conteos por clase del objetivo sobre la misma grilla.
+    Los cuantiles aproximados se interpolan dentro del bin (error máximo: un ancho de bin).
+    """
+
+    def __init__(self, n_bins=512, n_clases=2):
+        self.n_bins = n_bins
+        self.conteos = np.zeros((n_clases, n_bins), dtype=np.int64)
+        self.inicio = None
+        self.ancho = None
+
+    def _duplicar(self, hacia_abajo):
+        fusionados = self.conteos.reshape(len(self.conteos), self.n_bins // 2, 2).sum(axis=2)
+        self.conteos[:] = 0
+        if hacia_abajo:
+            self.inicio -= self.n_bins * self.ancho
+            self.conteos[:, self.n_bins // 2:] = fusionados
+        else:
+            self.conteos[:, :self.n_bins // 2] = fusionados
+        self.ancho *= 2
+
+    def actualizar(self, valores, clases):
+        # ±inf no cabe en ninguna grilla finita: la ampliación nunca terminaría (PerfilStreaming los cuenta aparte)
+        validos = np.isfinite(valores)
+        valores, clases = valores[validos], clases[validos]
+        if len(valores) == 0:
+            return
+        minimo, maximo = valores.min(), valores.max()
+        if self.inicio is None:
+            self.inicio = float(minimo)
+            self.ancho = float(maximo - minimo) / self.n_bins * 1.01 or 1.0
+        while minimo < self.inicio:
+            self._duplicar(hacia_abajo=True)
+        while maximo >= self.inicio + self.n_bins * self.ancho:
+            self._duplicar(hacia_abajo=False)
+
+        bins = np.clip(((valores - self.inicio) / self.ancho).astype(np.int64), 0, self.n_bins - 1)
+        for clase in range(len(self.conteos)):
+            self.conteos[clase] += np.bincount(bins[clases == clase], minlength=self.n_bins)
+
+    def bordes(self):
+        return self.inicio + self.ancho * np.arange(self.n_bins + 1)
+
+    def cuantiles(self, qs, clase=None):
+        conteos = self.conteos.sum(axis=0) if clase is None else self.conteos[clase]
+        acumulado = np.cumsum(conteos)
+        if acumulado[-1] == 0:
+            return np.full(len(qs), np.nan)
+        bordes = self.bordes()
+        resultado = []
+        for q in qs:
+            objetivo = q * acumulado[-1]
+            k = int(np.searchsorted(acumulado, objetivo))
+            previo = acumulado[k - 1] if k > 0 else 0
+            fraccion = (objetivo - previo) / conteos[k] if conteos[k] else 0.0
+            resultado.append(bordes[k] + fraccion * self.ancho)
+        return np.array(resultado)
+
+
+# --- Perfil completo ---
+class PerfilStreaming:
+    """Acumula, bloque a bloque, todas las estadísticas del AED sin retener los datos."""
+
+    def __init__(self, variables=VARIABLES_NUMERICAS, categoricas=VARIABLES_CATEGORICAS,
+                 objetivo=VARIABLE_OBJETIVO, n_bins=512):
+        self.variables = list(variables)
+        self.categoricas = list(categoricas)
+        self.objetivo = objetivo
+        k = len(self.variables)
+        # Momentos por clase del objetivo (fila 0 = Default 0, fila 1 = Default 1)
+        self.n = np.zeros((2, k))
+        self.media = np.zeros((2, k))
+        self.m2 = np.zeros((2, k))
+        self.minimo = np.full(k, np.inf)
+        self.maximo = np.full(k, -np.inf)
+        self.faltantes = pd.Series(0, index=self.variables + self.categoricas + [objetivo])
+        self.infinitos = pd.Series(0, index=self.variables)
+        self.filas = 0
+        self.histogramas = {v: HistogramaAdaptativo(n_bins) for v in self.variables}
+        self.categorias = {c: None for c in self.categoricas}
+        # Co-momentos para la correlación (filas completas, incluyendo el objetivo)
+        self._n_corr = 0
+        self._media_corr = np.zeros(k + 1)
+        self._co_m2 = np.zeros((k + 1, k + 1))
+
+    def actualizar(self, bloque):
+        self.filas += len(bloque)
+        self.faltantes = self.faltantes.add(bloque[self.faltantes.index].isnull().sum(), fill_value=0)
+        bloque = bloque[bloque[self.objetivo].notnull()]
+        X = bloque[self.variables].to_numpy(dtype=float)
+        clases = bloque[self.objetivo].to_numpy().astype(int)
+        # Los ±inf se cuentan aparte y se excluyen de momentos, extremos, cuantiles y correlación
+        infinitos = np.isinf(X)
+        self.infinitos += infinitos.sum(axis=0)
+        X[infinitos] = np.nan
+
+        with np.errstate(invalid='ignore'):
+            self.minimo = np.fmin(self.minimo, np.nanmin(X, axis=0, initial=np.inf))
+            self.maximo = np.fmax(self.maximo, np.nanmax(X, axis=0, initial=-np.inf))
+
+        for clase in (0, 1):
+            Xc = X[clases == clase]
+            n_b = np.sum(~np.isnan(Xc), axis=0).astype(float)
+            if not n_b.any():
+                continue
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media_b = np.where(n_b > 0, np.nansum(Xc, axis=0) / np.maximum(n_b, 1), 0.0)
+                m2_b = np.nansum((Xc - media_b) ** 2, axis=0)
+            self.n[clase], self.media[clase], self.m2[clase] = _combinar_momentos(
+                self.n[clase], self.media[clase], self.m2[clase], n_b, media_b, m2_b
+            )
+
+        for j, variable in enumerate(self.variables):
+            self.histogramas[variable].actualizar(X[:, j], clases)
+
+        for c in self.categoricas:
+            conteo = bloque.groupby([c, self.objetivo]).size()
+            previo = self.categorias[c]
+            self.categorias[c] = conteo if previo is None else previo.add(conteo, fill_value=0)
+
+        completos = np.column_stack([X, clases])
+        completos = completos[~np.isnan(completos).any(axis=1)]
+        if len(completos):
+            n_b = len(completos)
+            media_b = completos.mean(axis=0)
+            centrados = completos - media_b
+            co_b = centrados.T @ centrados
+            n = self._n_corr + n_b
+            delta = media_b - self._media_corr
+            self._co_m2 += co_b + np.outer(delta, delta) * self._n_corr * n_b / n
+            self._media_corr += delta * n_b / n
+            self._n_corr = n
+        return self
+
+    # --- Resultados ---
+    def _momentos_totales(self):
+        return _combinar_momentos(self.n[0], self.media[0], self.m2[0], self.n[1], self.media[1], self.m2[1])
+
+    def resumen(self):
+        """Equivalente a df.describe() (cuantiles aproximados)."""
+        n, media, m2 = self._momentos_totales()
+        cuantiles = np.array([self.histogramas[v].cuantiles([0.25, 0.5, 0.75]) for v in self.variables])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2 / (n - 1))
+        return pd.DataFrame({
+            'count': n, 'mean': media, 'std': std, 'min': self.minimo,
+            '25%': cuantiles[:, 0], '50%': cuantiles[:, 1], '75%': cuantiles[:, 2], 'max': self.maximo,
+        }, index=self.variables).T
+
+    def resumen_por_clase(self):
+        """Media, desviación y mediana aproximada de cada variable por valor del objetivo."""
+        filas = []
+        for clase in (0, 1):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                std = np.sqrt(self.m2[clase] / (self.n[clase] - 1))
+            for j, v in enumerate(self.variables):
+                filas.append({
+                    'variable': v, self.objetivo: clase, 'count': self.n[clase, j],
+                    'mean': self.media[clase, j], 'std': std[j],
+                    '50%': self.histogramas[v].cuantiles([0.5], clase)[0],
+                })
+        return pd.DataFrame(filas).set_index(['variable', self.objetivo])
+
+    def conteo_categorias(self, columna='Nivel_Educacional'):
+        """Conteo por categoría y por valor del objetivo (equivalente a value_counts + countplot)."""
+        tabla = self.categorias[columna].unstack(fill_value=0).astype(int)
+        tabla['Total'] = tabla.sum(axis=1)
+        return tabla.sort_values('Total', ascending=False)
+
+    def correlacion(self):
+        """Matriz de correlación de Pearson de las variables numéricas y el objetivo."""
+        d = np.sqrt(np.diag(self._co_m2))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self._co_m2 / np.outer(d, d)
+        nombres = self.variables + [self.objetivo]
+        return pd.DataFrame(corr, index=nombres, columns=nombres)
+
+
+def perfilar(nombre_archivo, tamano_bloque=50_000, n_bins=512):
+    """Recorre el archivo una vez y devuelve el perfil acumulado."""
+    perfil = PerfilStreaming(n_bins=n_bins)
+    for bloque in leer_por_bloques(nombre_archivo, tamano_bloque):
+        perfil.actualizar(bloque)
+    return perfil
+
+
+# --- Figuras (sin pantalla, en paralelo) ---
+def _figura_histograma(variable, bordes, conteos, ruta):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Recortamos a los bins observados (la grilla adaptativa puede exceder el rango) y reagrupamos a ~40 barras
+    ocupados = np.flatnonzero(conteos.sum(axis=0))
+    conteos = conteos[:, ocupados[0]:ocupados[-1] + 1]
+    bordes = bordes[ocupados[0]:ocupados[-1] + 2]
+    paso = max(1, len(conteos[0]) // 40)
+    bordes = bordes[::paso]
+    conteos = [np.add.reduceat(c, np.arange(0, len(c), paso))[:len(bordes) - 1] for c in conteos]
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    axes[0].stairs(conteos[0] + conteos[1], bordes, fill=True, color='skyblue')
+    axes[0].set_title(f'Distribución de {variable}')
+    axes[0].set_xlabel('Valor')
+    axes[0].set_ylabel('Frecuencia')
+    for clase, color in [(0, 'tab:blue'), (1, 'tab:orange')]:
+        total = max(conteos[clase].sum(), 1)
+        axes[1].stairs(conteos[clase] / total, bordes, label=f'Default = {clase}', color=color)
+    axes[1].set_title(f'Distribución de {variable} por Default (normalizada)')
+    axes[1].legend()
+    fig.tight_layout()
+    fig.savefig(ruta)
+    plt.close(fig)
+    return ruta
+
+
+def _figura_cajas(variable, estadisticas, ruta):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    ax.bxp(estadisticas, showfliers=False)
+    ax.set_title(f'Distribución de {variable} por Default (Boxplot aproximado, bigotes p5-p95)')
+    ax.set_xlabel('Default')
+    fig.tight_layout()
+    fig.savefig(ruta)
+    plt.close(fig)
+    return ruta
+
+
+def _figura_categorias(columna, tabla, ruta):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    tabla.drop(columns='Total').plot.bar(ax=ax, rot=0)
+    ax.set_title(f'Conteo de {columna} por Default')
+    ax.set_ylabel('N° Clientes')
+    fig.tight_layout()
+    fig.savefig(ruta)
+    plt.close(fig)
+    return ruta
+
+
+def _figura_correlacion(corr, ruta):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(corr, annot=True, cmap='viridis', fmt=".2f", linewidths=.5, ax=ax)
+    ax.set_title('Mapa de Calor de Correlaciones de Variables Numéricas', fontsize=16)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    fig.savefig(ruta)
+    plt.close(fig)
+    return ruta
+
+
+def graficar_perfil(perfil, carpeta_salida='figuras_aed', n_procesos=None):
+    """Renderiza todas las figuras del AED a archivos PNG, una tarea por figura repartida entre procesos."""
+    os.makedirs(carpeta_salida, exist_ok=True)
+    tareas = []
+    for v in perfil.variables:
+        h = perfil.histogramas[v]
+        if h.inicio is None:
+            continue
+        tareas.append((_figura_histograma, v, h.bordes(), h.conteos, os.path.join(carpeta_salida, f'hist_{v}.png')))
+
+        cajas = []
+        for clase in (0, 1):
+            q1, med, q3, p05, p95 = h.cuantiles([0.25, 0.5, 0.75, 0.05, 0.95], clase)
+            cajas.append({'label': str(clase), 'q1': q1, 'med': med, 'q3': q3, 'whislo': p05, 'whishi': p95})
+        tareas.append((_figura_cajas, v, cajas, os.path.join(carpeta_salida, f'box_{v}.png')))
+
+    for c in perfil.categoricas:
+        tareas.append((_figura_categorias, c, perfil.conteo_categorias(c), os.path.join(carpeta_salida, f'conteo_{c}.png')))
+    tareas.append((_figura_correlacion, perfil.correlacion(), os.path.join(carpeta_salida, 'correlacion.png')))
+
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        futuros = [pool.submit(funcion, *args) for funcion, *args in tareas]
+        return [f.result() for f in futuros]
+
+
+# --- Main ---
+def main(nombre_archivo="./Tabla Trabajo Grupal N°2.xlsx", tamano_bloque=50_000, carpeta_salida='figuras_aed'):
+    perfil = perfilar(nombre_archivo, tamano_bloque)
+
+    print(f'Perfil streaming: {perfil.filas} registros procesados')
+    print(f"Datos faltantes por columna:\n{perfil.faltantes.astype(int)}")
+    if perfil.infinitos.any():
+        print(f"Valores infinitos (excluidos de las estadísticas):\n{perfil.infinitos[perfil.infinitos > 0]}")
+    print(perfil.resumen())
+    print(perfil.resumen_por_clase())
+    print(perfil.conteo_categorias())
+    print(perfil.correlacion().round(2))
+
+    rutas = graficar_perfil(perfil, carpeta_salida)
+    print(f"🖼️ {len(rutas)} figuras guardadas en: {os.path.abspath(carpeta_salida)}")
+    return perfil
+
+
+if __name__ == "__main__":
+    # Uso: python perfil_streaming.py [ruta_archivo]
+    main(*sys.argv[1:2])
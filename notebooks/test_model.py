@@ -13,6 +13,9 @@ COLUMNAS_INPUT = [
     'Deuda_Comercial', 'Deuda_Credito', 'Otras_Deudas', 'Ratio_Ingresos_Deudas'
 ]
 
+# Permite deserializar encoders nativos (src/codificador_target.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
 # --- Funciones de Utilidad ---
 
 def cargar_artefactos(ruta_modelo='model.pkl', ruta_encoder='encoder.pkl'):
@@ -0,0 +1,163 @@
+# codificador_target.py
+# Codificador Target nativo (sin category_encoders), serializable en encoder.pkl y usable por la API.
+
+import numpy as np
+import pandas as pd
+
+
+class CodificadorTarget:
+    """
+    Target encoding suavizado con la misma fórmula que category_encoders.TargetEncoder:
+    valor = prior * (1 - s) + media_categoria * s, con s = 1 / (1 + exp(-(n - min_samples_leaf) / smoothing)).
+    Las categorías desconocidas reciben el prior (media global del target). Los faltantes se tratan como una categoría
+    más si aparecen en el ajuste (clave None en mapping_); si no, también reciben el prior.
+
+    Las estadísticas se calculan con una reducción agrupada de NumPy (códigos enteros + bincount) y la
+    transformación es una búsqueda en una tabla indexada por código de categoría.
+    """
+
+    def __init__(self, columna='Nivel_Educacional', min_samples_leaf=20, smoothing=10):
+        self.columna = columna
+        self.min_samples_leaf = min_samples_leaf
+        self.smoothing = smoothing
+        # Estadísticas acumuladas (permiten ajustar por bloques)
+        self.conteos_ = {}
+        self.sumas_ = {}
+        self.n_total_ = 0
+        self.suma_total_ = 0.0
+        # Resultado del ajuste
+        self.mapping_ = None
+        self.prior_ = None
+
+    # --- Estadísticas agrupadas ---
+    @staticmethod
+    def _codificar(valores, categorias=None):
+        """
+        Códigos enteros de cada fila y las categorías correspondientes (sin faltantes):
+        0..k-1 = categoría, k = faltante, -1 = desconocida.
+        """
+        valores = np.asarray(valores, dtype=object)
+        if categorias is None:
+            codigos, categorias = pd.factorize(valores)
+            categorias = pd.Index(categorias, dtype=object)
+        else:
+            codigos = categorias.get_indexer(valores)
+        codigos[pd.isna(valores)] = len(categorias)
+        return codigos, categorias
+
+    def _suavizar(self, conteos, sumas, prior):
+        """Valor codificado para arreglos de conteos y sumas por categoría (conteo 0 -> prior)."""
+        conteos = np.asarray(conteos, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            medias = np.asarray(sumas, dtype=float) / conteos
+        s = 1 / (1 + np.exp(-(conteos - self.min_samples_leaf) / self.smoothing))
+        return np.where(conteos > 0, prior * (1 - s) + medias * s, prior)
+
+    # --- Ajuste por bloques (streaming) ---
+    def actualizar(self, X, y):
+        """Acumula conteos y sumas del target por categoría para un bloque de datos."""
+        y = np.asarray(y, dtype=float)
+        codigos, categorias = self._codificar(X[self.columna])
+        conteos = np.bincount(codigos, minlength=len(categorias) + 1)
+        sumas = np.bincount(codigos, weights=y, minlength=len(categorias) + 1)
+        for categoria, n, suma in zip([*categorias, None], conteos, sumas):
+            if n == 0:
+                continue
+            self.conteos_[categoria] = self.conteos_.get(categoria, 0) + int(n)
+            self.sumas_[categoria] = self.sumas_.get(categoria, 0.0) + float(suma)
+        self.n_total_ += len(y)
+        self.suma_total_ += float(y.sum())
+        return self
+
+    def finalizar(self):
+        """Calcula el mapeo suavizado y la tabla de búsqueda a partir de las estadísticas acumuladas."""
+        if self.n_total_ == 0:
+            raise ValueError("El codificador no ha recibido datos.")
+        self.prior_ = self.suma_total_ / self.n_total_
+        categorias = list(self.conteos_)
+        valores = self._suavizar([self.conteos_[c] for c in categorias], [self.sumas_[c] for c in categorias], self.prior_)
+        self.mapping_ = dict(zip(categorias, valores.tolist()))
+        self._construir_tabla()
+        return self
+
+    def _construir_tabla(self):
+        # Tabla por código: categorías, faltante y, en la última posición (código -1, desconocida), el prior
+        categorias = [c for c in self.mapping_ if c is not None]
+        self.categorias_ = pd.Index(categorias, dtype=object)
+        self.tabla_ = np.array([*(self.mapping_[c] for c in categorias), self.mapping_.get(None, self.prior_),
+                                self.prior_], dtype=float)
+
+    def fit(self, X, y):
+        """Ajuste en memoria (equivalente a un único bloque)."""
+        self.__init__(self.columna, self.min_samples_leaf, self.smoothing)
+        return self.actualizar(X, y).finalizar()
+
+    # --- Ajuste fuera de pliegue ---
+    def ajustar_transformar_oof(self, X, y, n_pliegues=5, semilla=21, inplace=False):
+        """
+        Ajusta el codificador con todos los datos (para test / despliegue) y devuelve X codificado fuera de pliegue:
+        cada fila usa las estadísticas (conteos, sumas y prior) de los demás pliegues, evitando la fuga del target.
+        Todos los pliegues se resuelven en una sola reducción agrupada por (pliegue, categoría).
+        """
+        if n_pliegues < 2:
+            raise ValueError("n_pliegues debe ser al menos 2.")
+        self.fit(X, y)
+        y = np.asarray(y, dtype=float)
+        n = len(y)
+        pliegues = np.empty(n, dtype=np.int64)
+        pliegues[np.random.default_rng(semilla).permutation(n)] = np.arange(n) % n_pliegues
+
+        codigos, categorias = self._codificar(X[self.columna], self.categorias_)
+        k = len(categorias) + 1  # categorías + faltante
+        validos = codigos >= 0
+        grupo = pliegues[validos] * k + codigos[validos]
+        conteos = np.bincount(grupo, minlength=n_pliegues * k).reshape(n_pliegues, k)
+        sumas = np.bincount(grupo, weights=y[validos], minlength=n_pliegues * k).reshape(n_pliegues, k)
+        n_pliegue = np.bincount(pliegues, minlength=n_pliegues)
+        suma_pliegue = np.bincount(pliegues, weights=y, minlength=n_pliegues)
+
+        # Estadísticas sin el pliegue propio: total - pliegue
+        conteos_oof = conteos.sum(axis=0) - conteos
+        sumas_oof = sumas.sum(axis=0) - sumas
+        prior_oof = (y.sum() - suma_pliegue) / (n - n_pliegue)
+        tablas = np.column_stack([self._suavizar(conteos_oof, sumas_oof, prior_oof[:, None]), prior_oof])
+
+        X_encoded = X if inplace else X.copy()
+        X_encoded[self.columna] = tablas[pliegues, codigos]
+        return X_encoded
+
+    # --- Transformación ---
+    def transformar_codigos(self, valores):
+        """Arreglo float con la codificación de `valores` (búsqueda por código entero)."""
+        if self.mapping_ is None:
+            raise ValueError("El codificador no está ajustado. Llame a fit() o finalizar() primero.")
+        if getattr(self, 'tabla_', None) is None:
+            self._construir_tabla()  # artefactos serializados antes de existir la tabla
+        codigos, _ = self._codificar(valores, self.categorias_)
+        return self.tabla_.take(codigos, mode='wrap')
+
+    def transform(self, X, inplace=False):
+        """
+        Devuelve X con la columna categórica reemplazada por su codificación.
+        Con inplace=True se reemplaza solo esa columna en el mismo DataFrame (sin copiar el resto).
+        """
+        valores = self.transformar_codigos(X[self.columna])
+        X_encoded = X if inplace else X.copy()
+        X_encoded[self.columna] = valores
+        return X_encoded
+
+
+# --- Tabla de búsqueda (para scoring_lote y scoring_precision) ---
+def extraer_mapeo_encoder(encoder):
+    """
+    Devuelve (columna, {categoria: valor}, valor_por_defecto) a partir del encoder desplegado.
+    Soporta el CodificadorTarget nativo y el TargetEncoder de category_encoders.
+    """
+    if hasattr(encoder, 'mapping_'):
+        return encoder.columna, dict(encoder.mapping_), encoder.prior_
+
+    columna = encoder.cols[0]
+    ordinal = next(m['mapping'] for m in encoder.ordinal_encoder.mapping if m['col'] == columna)
+    valores = encoder.mapping[columna]
+    mapeo = {cat: float(valores[codigo]) for cat, codigo in ordinal.items() if isinstance(cat, str)}
+    return columna, mapeo, float(valores[-1])
@@ -0,0 +1,61 @@
+# estaticos.py
+# Recursos estáticos locales (CSS de Tailwind compilado, JavaScript del formulario) con caché HTTP.
+#
+# Los archivos de src/static/ se leen una vez al iniciar y se sirven en /static/<archivo>?v=<hash> con un ETag fuerte
+# (SHA-256 del contenido) y Cache-Control inmutable: el hash en la URL cambia cuando cambia el archivo.
+# El mismo mecanismo de ETag se usa para páginas generadas al iniciar (ver /form en main2.py).
+
+import hashlib
+import mimetypes
+from pathlib import Path
+
+from fastapi import HTTPException, Request, Response
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "public, no-cache"  # el navegador guarda la copia y la revalida con If-None-Match (304)
+
+
+def etiqueta_fuerte(contenido: bytes) -> str:
+    """ETag fuerte a partir del contenido."""
+    return '"' + hashlib.sha256(contenido).hexdigest()[:32] + '"'
+
+
+def _coincide(if_none_match, etag):
+    # Comparación de If-None-Match (RFC 9110: comparación débil, se ignora el prefijo W/)
+    if not if_none_match:
+        return False
+    candidatos = [c.strip().removeprefix('W/') for c in if_none_match.split(',')]
+    return '*' in candidatos or etag in candidatos
+
+
+def respuesta_con_etag(request: Request, contenido: bytes, media_type: str, etag: str, cache_control: str) -> Response:
+    """Devuelve 304 si el cliente ya tiene la versión `etag`; si no, el contenido con ETag y Cache-Control."""
+    encabezados = {"ETag": etag, "Cache-Control": cache_control}
+    if _coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=encabezados)
+    return Response(contenido, media_type=media_type, headers=encabezados)
+
+
+def registrar_estaticos(app, carpeta, prefijo="/static"):
+    """
+    Carga los archivos de `carpeta` y agrega GET {prefijo}/{archivo} a la app.
+    Devuelve {archivo: url_versionada} para referenciarlos desde el HTML.
+    """
+    recursos = {}
+    for ruta in sorted(Path(carpeta).iterdir()):
+        if not ruta.is_file() or ruta.name.startswith('.') or '.fuente.' in ruta.name:
+            continue
+        contenido = ruta.read_bytes()
+        tipo = mimetypes.guess_type(ruta.name)[0] or "application/octet-stream"
+        if tipo.startswith("text/") or tipo == "application/javascript":
+            tipo += "; charset=utf-8"
+        recursos[ruta.name] = (contenido, tipo, etiqueta_fuerte(contenido))
+
+    @app.get(prefijo + "/{archivo}", include_in_schema=False)
+    def servir_estatico(archivo: str, request: Request):
+        if archivo not in recursos:
+            raise HTTPException(status_code=404, detail="Not Found")
+        contenido, tipo, etag = recursos[archivo]
+        return respuesta_con_etag(request, contenido, tipo, etag, CACHE_INMUTABLE)
+
+    return {nombre: f"{prefijo}/{nombre}?v={etag.strip(chr(34))[:12]}" for nombre, (_, _, etag) in recursos.items()}
@@ -6,9 +6,19 @@ from enum import Enum
 import pandas as pd
 import pickle
 import os
+import sys
 from typing import List
 from pathlib import Path
 
+# Módulos propios de src/: importables también al iniciar desde la raíz (uvicorn src.main:app), y necesarios para
+# deserializar artefactos que los usan (p. ej. codificador_target)
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from perfilado import registrar_perfilado
+from scoring_lote import registrar_scoring_lote
+from scoring_ws import registrar_scoring_ws
+
 # --- CONFIGURACIÓN DE ARTEFACTOS Y CONSTANTES ---
 
 # Rutas y nombres de archivos de artefactos.
@@ -107,6 +117,11 @@ def predecir(df_input: pd.DataFrame):
     prob_default = probabilidades[0][1] 
     pred_class = MODELO_ML.predict(df_encoded)[0] 
     
+    return construir_respuesta(pred_class, prob_default)
+
+
+def construir_respuesta(pred_class, prob_default):
+    """Arma el diccionario de respuesta de una predicción."""
     resultado_texto = "ALTO RIESGO de Default (1)" if pred_class == 1 else "BAJO RIESGO / PAGADOR (0)"
 
     return {
@@ -148,3 +163,13 @@ def predecir_default(cliente: ClienteData):
             status_code=500,
             detail=f"Error interno del servidor al procesar la predicción: {e}. Por favor, verifique el formato de entrada."
         )
+
+# --- SCORING MASIVO (JSON columnar, Arrow IPC, MessagePack) ---
+registrar_scoring_lote(app, sys.modules[__name__])
+
+# --- CANAL WEBSOCKET (clientes de alta frecuencia) ---
+registrar_scoring_ws(app, sys.modules[__name__])
+
+# --- PERFILADO BAJO DEMANDA (administrador) ---
+# POST /debug/profile con el header X-Admin-Token (variable de entorno ADMIN_TOKEN). Sin costo mientras no se usa.
+registrar_perfilado(app, sys.modules[__name__])
@@ -7,8 +7,20 @@ from enum import Enum
 import pandas as pd
 import pickle
 import os
+import sys
 import json
 from pathlib import Path
+
+# Módulos propios de src/: importables también al iniciar desde la raíz (uvicorn src.main2:app), y necesarios para
+# deserializar artefactos que los usan (p. ej. codificador_target)
+if str(Path(__file__).resolve().parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from estaticos import CACHE_REVALIDAR, etiqueta_fuerte, registrar_estaticos, respuesta_con_etag
+from perfilado import registrar_perfilado
+from scoring_lote import registrar_scoring_lote
+from scoring_ws import registrar_scoring_ws
+
 # --- CONFIGURACIÓN DE ARTEFACTOS Y CONSTANTES ---
 
 # Rutas y nombres de archivos de artefactos.
@@ -105,6 +117,11 @@ def predecir(df_input: pd.DataFrame):
     prob_default = probabilidades[0][1] 
     pred_class = MODELO_ML.predict(df_encoded)[0] 
     
+    return construir_respuesta(pred_class, prob_default)
+
+
+def construir_respuesta(pred_class, prob_default):
+    """Arma el diccionario de respuesta de una predicción."""
     resultado_texto = "ALTO RIESGO de Default (1)" if pred_class == 1 else "BAJO RIESGO / PAGADOR (0)"
 
     return {
@@ -149,6 +166,9 @@ def predecir_default(cliente: ClienteData):
 
 # --- INTERFAZ DE FORMULARIO AMIGABLE ---
 
+# Tailwind compilado y JavaScript del formulario, servidos localmente con caché (src/static/)
+RECURSOS_ESTATICOS = registrar_estaticos(app, BASE_DIR / "static")
+
 # Diccionario para mapear los campos a etiquetas y tipos amigables en el formulario
 FORM_FIELDS = [
     {"id": "Edad", "label": "Edad", "type": "number", "min": 18, "default": 56, "hint": "Tipo: Número Entero (Ej: 56)"},
@@ -161,8 +181,11 @@ FORM_FIELDS = [
     {"id": "Ratio_Ingresos_Deudas", "label": "Ratio Ingresos/Deudas", "type": "number", "step": 0.0001, "default": 0.04, "hint": "Tipo: Número Decimal (Ej: 0.04)"},
 ]
 
-def generate_form_html(request: Request) -> str:
-    """Genera la estructura HTML del formulario."""
+def generate_form_html(request: Request = None) -> str:
+    """
+    Genera la estructura HTML del formulario. Sin `request` las rutas de la API quedan relativas al mismo origen,
+    por lo que la página no depende de la petición y puede generarse una sola vez al iniciar.
+    """
     
     # 1. Generar los campos de entrada
     form_fields_html = ""
@@ -201,10 +224,10 @@ def generate_form_html(request: Request) -> str:
         </div>
         """
 
-    # 2. Obtener la URL base para el JavaScript
-    base_url = str(request.base_url).rstrip('/')
+    # 2. URL base de la API para el JavaScript (vacía = mismo origen)
+    base_url = str(request.base_url).rstrip('/') if request is not None else ""
 
-    # 3. Estructura HTML completa con Tailwind y JavaScript
+    # 3. Estructura HTML completa; Tailwind (compilado) y el JavaScript se sirven localmente desde /static
     html_content = f"""
     <!DOCTYPE html>
     <html lang="es">
@@ -212,13 +235,7 @@ def generate_form_html(request: Request) -> str:
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Evaluación de Riesgo Crediticio</title>
-        <script src="https://cdn.tailwindcss.com"></script>
-        <style>
-            body {{ font-family: 'Inter', sans-serif; background-color: #f4f7f9; }}
-            .loader {{ border-top-color: #3498db; -webkit-animation: spin 1s ease-in-out infinite; animation: spin 1s ease-in-out infinite; }}
-            @-webkit-keyframes spin {{ 0% {{ -webkit-transform: rotate(0deg); }} 100% {{ -webkit-transform: rotate(360deg); }} }}
-            @keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}
-        </style>
+        <link rel="stylesheet" href="{RECURSOS_ESTATICOS['estilos.css']}">
     </head>
     <body class="p-4 sm:p-8 flex justify-center items-start min-h-screen">
 
@@ -230,7 +247,7 @@ def generate_form_html(request: Request) -> str:
                 Complete el formulario para enviar la solicitud al modelo `/predict`.
             </p>
             
-            <form id="predictionForm" class="space-y-4">
+            <form id="predictionForm" class="space-y-4" data-api-predict="{base_url}/predict" data-api-batch="{base_url}/predict_batch">
                 {form_fields_html}
                 <button type="submit" id="submitButton" class="w-full py-3 bg-indigo-600 text-white font-semibold rounded-xl shadow-md hover:bg-indigo-700 transition duration-150 flex items-center justify-center">
                     <span id="buttonText">Evaluar Riesgo</span>
@@ -238,6 +255,27 @@ def generate_form_html(request: Request) -> str:
                 </button>
             </form>
 
+            <form id="csvForm" class="mt-8 pt-6 border-t border-gray-200 space-y-3">
+                <h2 class="text-lg font-bold text-gray-900">Evaluar un archivo CSV</h2>
+                <p class="text-xs text-gray-500">
+                    Una fila por cliente y una columna por variable ({', '.join(COLUMNAS_INPUT)}); separador "," o ";".
+                    Se evalúa todo el archivo en una sola petición a `/predict_batch`.
+                </p>
+                <input type="file" id="csvFile" name="csvFile" accept=".csv,text/csv"
+                       class="w-full text-sm text-gray-700 file:mr-3 file:py-2 file:px-3 file:rounded-lg file:border-0 file:bg-indigo-50 file:text-indigo-700 hover:file:bg-indigo-100" required>
+                <button type="submit" id="csvButton" class="w-full py-3 bg-gray-800 text-white font-semibold rounded-xl shadow-md hover:bg-gray-900 transition duration-150 flex items-center justify-center">
+                    <span id="csvButtonText">Evaluar Archivo CSV</span>
+                    <div id="csvLoader" class="loader ease-linear rounded-full border-4 border-t-4 border-gray-200 h-6 w-6 ml-3 hidden"></div>
+                </button>
+            </form>
+
+            <div id="batchBox" class="mt-8 p-5 rounded-xl border-l-4 border-indigo-500 bg-indigo-50 text-gray-800 hidden" role="alert">
+                <h3 class="text-xl font-bold mb-2">Resultado del Archivo</h3>
+                <p id="batchSummary" class="text-sm mb-3"></p>
+                <table id="batchTable" class="text-sm font-mono"></table>
+                <a id="batchDownload" download="resultados_riesgo.csv" class="inline-block mt-3 text-sm font-semibold text-indigo-700 hover:underline">Descargar resultados (CSV)</a>
+            </div>
+
             <div id="resultBox" class="mt-8 p-5 rounded-xl border-l-4 hidden transition duration-300" role="alert">
                 <h3 id="resultTitle" class="text-xl font-bold mb-2">Resultado:</h3>
                 <p id="resultText" class="text-lg"></p>
@@ -250,101 +288,35 @@ def generate_form_html(request: Request) -> str:
             </div>
         </div>
 
-        <script>
-            const form = document.getElementById('predictionForm');
-            const resultBox = document.getElementById('resultBox');
-            const resultTitle = document.getElementById('resultTitle');
-            const resultText = document.getElementById('resultText');
-            const probabilityText = document.getElementById('probabilityText');
-            const errorBox = document.getElementById('errorBox');
-            const errorText = document.getElementById('errorText');
-            const submitButton = document.getElementById('submitButton');
-            const buttonText = document.getElementById('buttonText');
-            const loader = document.getElementById('loader');
-            
-            const API_URL = "{base_url}/predict";
-
-            form.addEventListener('submit', async (e) => {{
-                e.preventDefault();
-                
-                // Limpiar resultados anteriores
-                resultBox.classList.add('hidden');
-                errorBox.classList.add('hidden');
-                
-                // Mostrar Loader
-                submitButton.disabled = true;
-                buttonText.textContent = "Evaluando...";
-                loader.classList.remove('hidden');
-
-                const formData = new FormData(form);
-                const payload = {{}};
-
-                // Convertir FormData a JSON
-                for (let [key, value] of formData.entries()) {{
-                    // Pydantic espera los tipos correctos
-                    if (['Edad', 'Años_Trabajando'].includes(key)) {{
-                        payload[key] = parseInt(value);
-                    }} else if (['Ingresos', 'Deuda_Comercial', 'Deuda_Credito', 'Otras_Deudas', 'Ratio_Ingresos_Deudas'].includes(key)) {{
-                        payload[key] = parseFloat(value);
-                    }} else {{
-                        payload[key] = value;
-                    }}
-                }}
-
-                try {{
-                    const response = await fetch(API_URL, {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify(payload)
-                    }});
-
-                    const data = await response.json();
-
-                    if (!response.ok) {{
-                        // Error del servidor (400, 500, etc.)
-                        errorText.textContent = data.detail || "Error desconocido del servidor.";
-                        errorBox.classList.remove('hidden');
-                        return;
-                    }}
-
-                    // Predicción exitosa (200)
-                    const isDefault = data.prediction_class === 1;
-                    const prob = (data.probability_default * 100).toFixed(2);
-                    
-                    resultTitle.textContent = "Resultado de Evaluación";
-                    resultText.textContent = data.prediction_status;
-                    
-                    // FIX: Uso de concatenación JS (+) en lugar de template literals (`) para evitar error de Python.
-                    probabilityText.textContent = 'Probabilidad de Default: ' + prob + '%';
-
-                    // Estilos dinámicos
-                    if (isDefault) {{
-                        resultBox.className = 'mt-8 p-5 rounded-xl border-l-4 border-red-500 bg-red-50 text-red-800';
-                    }} else {{
-                        resultBox.className = 'mt-8 p-5 rounded-xl border-l-4 border-green-500 bg-green-50 text-green-800';
-                    }}
-                    resultBox.classList.remove('hidden');
-
-                }} catch (error) {{
-                    // FIX: Uso de concatenación JS (+) en lugar de template literals (`) para evitar error de Python.
-                    errorText.textContent = 'No se pudo conectar con la API: ' + error.message;
-                    errorBox.classList.remove('hidden');
-                }} finally {{
-                    // Ocultar Loader
-                    submitButton.disabled = false;
-                    buttonText.textContent = "Evaluar Riesgo";
-                    loader.classList.add('hidden');
-                }}
-            }});
-        </script>
+        <script src="{RECURSOS_ESTATICOS['formulario.js']}"></script>
     </body>
     </html>
     """
     return html_content
 
+
+# Con FORM_CACHEADO (por defecto) la página se genera una sola vez al iniciar y se sirve con ETag fuerte:
+# el navegador la guarda y la revalida con If-None-Match (304 sin cuerpo). FORM_CACHEADO=0 la genera en cada petición.
+FORM_CACHEADO = os.environ.get("FORM_CACHEADO", "1") != "0"
+FORM_HTML = generate_form_html().encode("utf-8") if FORM_CACHEADO else None
+FORM_ETAG = etiqueta_fuerte(FORM_HTML) if FORM_CACHEADO else None
+
+
 @app.get("/form", response_class=HTMLResponse, summary="Formulario Web Amigable")
 async def get_prediction_form(request: Request):
     """
-    Sirve una página web con un formulario para ingresar datos y probar la API de forma visual.
+    Sirve una página web con un formulario para ingresar datos (o subir un CSV) y probar la API de forma visual.
     """
-    return generate_form_html(request)
+    if FORM_CACHEADO:
+        return respuesta_con_etag(request, FORM_HTML, "text/html; charset=utf-8", FORM_ETAG, CACHE_REVALIDAR)
+    return HTMLResponse(generate_form_html(request))
+
+# --- SCORING MASIVO (JSON columnar, Arrow IPC, MessagePack) ---
+registrar_scoring_lote(app, sys.modules[__name__])
+
+# --- CANAL WEBSOCKET (clientes de alta frecuencia) ---
+registrar_scoring_ws(app, sys.modules[__name__])
+
+# --- PERFILADO BAJO DEMANDA (administrador) ---
+# POST /debug/profile con el header X-Admin-Token (variable de entorno ADMIN_TOKEN). Sin costo mientras no se usa.
+registrar_perfilado(app, sys.modules[__name__])
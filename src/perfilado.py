@@ -0,0 +1,213 @@
+# perfilado.py
+# Perfilado bajo demanda de los workers de scoring (endpoint /debug/profile, protegido por token de administrador).
+#
+# Mientras no hay una captura activa no existe ningún costo: las funciones de scoring de cada camino (objetivos)
+# se reemplazan por versiones perfiladas solo durante la captura y se restauran al terminar.
+#   - "predict": `predecir` del módulo de la API (/predict).
+#   - "lote":    scoring_lote.procesar_lote: decodificación, validación, codificación target, scoring y respuesta
+#                de cada petición de /predict_batch (también ?precision=float32).
+#   - "ws":      ConexionScoring._puntuar: construcción de la matriz (validación y codificación) y scoring de cada
+#                micro-lote de /ws/predict.
+#   - "todos":   los anteriores a la vez (por defecto).
+# Modos:
+#   - "cprofile": cProfile determinista; devuelve las funciones más costosas (ncalls, tottime, cumtime).
+#   - "muestreo": muestreo de pilas cada `intervalo_ms`; devuelve un archivo de pilas colapsadas
+#                 (formato de flamegraph.pl / speedscope: "f1;f2;f3 conteo").
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+import scoring_lote
+from scoring_ws import ConexionScoring
+
+# Token requerido en el header X-Admin-Token. Si la variable no está definida, el endpoint queda deshabilitado.
+VARIABLE_TOKEN = "ADMIN_TOKEN"
+SEGUNDOS_MAXIMOS = 300
+
+
+def objetivos_scoring(modulo):
+    """{objetivo: [(objeto, nombre_funcion), ...]} con las funciones de scoring de cada camino de la API `modulo`."""
+    objetivos = {
+        'predict': [(modulo, 'predecir')],
+        'lote': [(scoring_lote, 'procesar_lote')],
+        'ws': [(ConexionScoring, '_puntuar')],
+    }
+    objetivos['todos'] = [funcion for funciones in list(objetivos.values()) for funcion in funciones]
+    return objetivos
+
+
+class Perfilador:
+    """
+    Captura un perfil de las funciones de un objetivo durante las próximas N llamadas o T segundos.
+    `objetivos` es {objetivo: [(objeto, nombre_funcion), ...]} (ver objetivos_scoring); las funciones no se anidan entre sí.
+    """
+
+    def __init__(self, objetivos):
+        self.objetivos = objetivos
+        self.activo = False
+
+    # --- Envolturas (solo instaladas durante la captura) ---
+    def _envoltura_cprofile(self, original, estado):
+        def funcion_perfilada(*args, **kwargs):
+            # cProfile (sys.monitoring en 3.12+) admite un solo perfilador activo: serializamos las llamadas
+            with estado['lock']:
+                perfil = cProfile.Profile()
+                try:
+                    return perfil.runcall(original, *args, **kwargs)
+                finally:
+                    estado['stats'] = pstats.Stats(perfil) if estado['stats'] is None else estado['stats'].add(perfil)
+                    self._contar(estado)
+        return funcion_perfilada
+
+    def _envoltura_muestreo(self, original, estado):
+        def funcion_muestreada(*args, **kwargs):
+            hilo = threading.get_ident()
+            estado['hilos'].add(hilo)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                estado['hilos'].discard(hilo)
+                with estado['lock']:
+                    self._contar(estado)
+        return funcion_muestreada
+
+    def _contar(self, estado):
+        estado['llamadas'] += 1
+        if estado['n_peticiones'] and estado['llamadas'] >= estado['n_peticiones']:
+            estado['loop'].call_soon_threadsafe(estado['fin'].set)
+
+    # --- Muestreador de pilas ---
+    @staticmethod
+    def _muestrear(estado, intervalo):
+        pilas = estado['pilas']
+        while not estado['detener'].is_set():
+            frames = sys._current_frames()
+            for hilo in list(estado['hilos']):
+                frame = frames.get(hilo)
+                marcos = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    marcos.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    frame = frame.f_back
+                if marcos:
+                    pilas[';'.join(reversed(marcos))] += 1
+            time.sleep(intervalo)
+
+    # --- Captura ---
+    async def capturar(self, modo='cprofile', n_peticiones=None, segundos=30.0, intervalo_ms=1.0, objetivo='todos'):
+        if objetivo not in self.objetivos:
+            raise HTTPException(status_code=422, detail=f"objetivo debe ser uno de: {', '.join(self.objetivos)}")
+        if self.activo:
+            raise HTTPException(status_code=409, detail="Ya hay una captura de perfil en curso.")
+        self.activo = True
+
+        originales = [(objeto, nombre, getattr(objeto, nombre)) for objeto, nombre in self.objetivos[objetivo]]
+        estado = {
+            'lock': threading.Lock(), 'llamadas': 0, 'n_peticiones': n_peticiones,
+            'loop': asyncio.get_running_loop(), 'fin': asyncio.Event(),
+            'stats': None, 'hilos': set(), 'pilas': Counter(), 'detener': threading.Event(),
+        }
+        envoltura = self._envoltura_cprofile if modo == 'cprofile' else self._envoltura_muestreo
+        muestreador = None
+        if modo == 'muestreo':
+            muestreador = threading.Thread(target=self._muestrear, args=(estado, intervalo_ms / 1000), daemon=True)
+            muestreador.start()
+
+        for objeto, nombre, original in originales:
+            setattr(objeto, nombre, envoltura(original, estado))
+        inicio = time.perf_counter()
+        try:
+            try:
+                await asyncio.wait_for(estado['fin'].wait(), timeout=segundos)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            for objeto, nombre, original in originales:
+                setattr(objeto, nombre, original)
+            estado['detener'].set()
+            if muestreador is not None:
+                muestreador.join()
+            self.activo = False
+
+        duracion = time.perf_counter() - inicio
+        if modo == 'cprofile':
+            with estado['lock']:
+                return self._resumen_cprofile(estado['stats'], estado['llamadas'], duracion)
+        return estado['pilas'], estado['llamadas'], duracion
+
+    @staticmethod
+    def _resumen_cprofile(stats, llamadas, duracion, top=40):
+        resumen = {'peticiones_perfiladas': llamadas, 'duracion_s': round(duracion, 3), 'funciones': []}
+        if stats is None:
+            return resumen
+        filas = []
+        for (archivo, linea, funcion), (cc, nc, tt, ct, _) in stats.stats.items():
+            filas.append({
+                'funcion': f"{os.path.basename(archivo)}:{linea}({funcion})",
+                'ncalls': nc, 'tottime_s': round(tt, 6), 'cumtime_s': round(ct, 6),
+            })
+        resumen['funciones'] = sorted(filas, key=lambda f: f['cumtime_s'], reverse=True)[:top]
+
+        texto = io.StringIO()
+        stats.stream = texto
+        stats.sort_stats('cumulative').print_stats(top)
+        resumen['pstats'] = texto.getvalue()
+        return resumen
+
+
+def _verificar_token(x_admin_token):
+    esperado = os.environ.get(VARIABLE_TOKEN)
+    if not esperado:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, esperado):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido.")
+
+
+def registrar_perfilado(app, modulo):
+    """Agrega el endpoint /debug/profile a la app, perfilando las funciones de scoring de `modulo` (objetivos_scoring)."""
+    perfilador = Perfilador(objetivos_scoring(modulo))
+
+    @app.post(
+        "/debug/profile",
+        summary="Perfilado bajo demanda (administrador)",
+        description="Perfila el scoring de /predict, /predict_batch y/o /ws/predict (según `objetivo`) durante las "
+                    "próximas N llamadas o T segundos. Requiere el header X-Admin-Token.",
+        include_in_schema=False,
+    )
+    async def perfilar(
+        modo: str = Query("cprofile", pattern="^(cprofile|muestreo)$"),
+        peticiones: int = Query(None, ge=1, description="Detener tras N llamadas perfiladas (un lote cuenta como una)."),
+        segundos: float = Query(30.0, gt=0, le=SEGUNDOS_MAXIMOS, description="Duración máxima de la captura."),
+        intervalo_ms: float = Query(1.0, gt=0, description="Intervalo de muestreo (modo muestreo)."),
+        objetivo: str = Query("todos", description="Camino a perfilar: todos, predict, lote o ws."),
+        x_admin_token: str = Header(None),
+    ):
+        _verificar_token(x_admin_token)
+        resultado = await perfilador.capturar(modo, peticiones, segundos, intervalo_ms, objetivo)
+
+        if modo == 'cprofile':
+            return resultado
+
+        pilas, llamadas, duracion = resultado
+        colapsado = "\n".join(f"{pila} {conteo}" for pila, conteo in pilas.most_common())
+        return PlainTextResponse(
+            colapsado + "\n",
+            headers={
+                "Content-Disposition": 'attachment; filename="perfil.collapsed"',
+                "X-Peticiones-Perfiladas": str(llamadas),
+                "X-Duracion-Segundos": f"{duracion:.3f}",
+            },
+        )
+
+    return perfilador
@@ -0,0 +1,297 @@
+# scoring_lote.py
+# Scoring masivo en formato columnar: JSON por columnas, Apache Arrow IPC, MessagePack o CSV (negociación por Content-Type/Accept).
+# La validación es vectorizada por columna (sin un ClienteData por fila) y los datos se escriben directamente
+# en la matriz de scoring, sin diccionarios ni DataFrames intermedios.
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from codificador_target import extraer_mapeo_encoder
+from scoring_precision import puntuador_por_hilo
+
+TIPO_JSON = 'application/json'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+TIPOS_MSGPACK = ('application/msgpack', 'application/x-msgpack')
+TIPO_CSV = 'text/csv'
+VARIABLES_ENTERAS = ('Edad', 'Años_Trabajando')
+
+
+# --- Tabla de búsqueda del encoder ---
+_CACHE_MAPEO = {}
+
+
+def _mapeo(encoder):
+    clave = id(encoder)
+    if clave not in _CACHE_MAPEO:
+        _CACHE_MAPEO.clear()
+        _CACHE_MAPEO[clave] = extraer_mapeo_encoder(encoder)
+    return _CACHE_MAPEO[clave]
+
+
+# --- Decodificación de la petición (a columnas) ---
+def _leer_json(cuerpo):
+    datos = json.loads(cuerpo)
+    if isinstance(datos, list):
+        # Compatibilidad: lista de objetos ClienteData -> columnas
+        claves = set().union(*(fila.keys() for fila in datos)) if datos else set()
+        return {c: [fila.get(c) for fila in datos] for c in claves}, len(datos)
+    if isinstance(datos, dict):
+        return datos, None
+    raise HTTPException(status_code=422, detail="El cuerpo JSON debe ser un objeto de columnas o una lista de clientes.")
+
+
+def _leer_arrow(cuerpo):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Formato Arrow no disponible: instale pyarrow en el servidor.")
+    tabla = pa.ipc.open_stream(cuerpo).read_all()
+    columnas = {}
+    for nombre in tabla.column_names:
+        columna = tabla.column(nombre)
+        columnas[nombre] = columna.to_numpy(zero_copy_only=False)
+    return columnas, tabla.num_rows
+
+
+def _leer_msgpack(cuerpo):
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Formato MessagePack no disponible: instale msgpack en el servidor.")
+    datos = msgpack.unpackb(cuerpo, raw=False)
+    if not isinstance(datos, dict):
+        raise HTTPException(status_code=422, detail="El cuerpo MessagePack debe ser un mapa de columnas.")
+    return datos, None
+
+
+def _leer_csv(cuerpo):
+    # Encabezado con los nombres de las variables; separador "," o ";" (con ";" se acepta coma decimal, como en Excel)
+    texto = cuerpo.decode('utf-8-sig')
+    encabezado = texto.split('\n', 1)[0]
+    separador = ';' if encabezado.count(';') > encabezado.count(',') else ','
+    df = pd.read_csv(io.StringIO(texto), sep=separador, decimal=',' if separador == ';' else '.')
+    return {str(c).strip(): df[c].to_numpy() for c in df.columns}, len(df)
+
+
+# --- Validación vectorizada y construcción de la matriz ---
+def validar_columnas(columnas, n_filas, columnas_input, defaults, categorias_validas, columna_cat):
+    """
+    Valida cada columna como un arreglo (mismas reglas que ClienteData). Devuelve ({variable: arreglo de largo n}, n):
+    numéricas en float64, la categórica (`columna_cat`) como objetos y las ausentes como una vista constante del default
+    de ClienteData (sin ocupar memoria por fila).
+    """
+    desconocidas = set(columnas) - set(columnas_input)
+    if desconocidas:
+        raise HTTPException(status_code=422, detail=f"Columnas desconocidas: {sorted(desconocidas)}")
+
+    no_listas = sorted(nombre for nombre, v in columnas.items()
+                       if v is not None and not isinstance(v, (list, tuple, np.ndarray)))
+    if no_listas:
+        raise HTTPException(status_code=422, detail=f"Cada columna debe ser una lista de valores: {no_listas}")
+
+    if n_filas is None:
+        largos = {len(v) for v in columnas.values() if v is not None}
+        if len(largos) > 1:
+            raise HTTPException(status_code=422, detail="Todas las columnas deben tener el mismo largo.")
+        n_filas = largos.pop() if largos else 0
+
+    validadas = {}
+    errores = []
+
+    for nombre in columnas_input:
+        valores = columnas.get(nombre)
+        if valores is None:
+            tipo = object if nombre == columna_cat else np.float64
+            validadas[nombre] = np.broadcast_to(np.array(defaults[nombre], dtype=tipo), n_filas)
+            continue
+        if len(valores) != n_filas:
+            raise HTTPException(status_code=422, detail=f"La columna {nombre} tiene {len(valores)} filas; se esperaban {n_filas}.")
+
+        if nombre == columna_cat:
+            categorias = np.asarray(valores, dtype=object)
+            if categorias.ndim != 1:
+                errores.append(f"{nombre}: se esperaba una lista de valores (sin listas anidadas).")
+                continue
+            invalidas = ~np.isin(categorias, categorias_validas)
+            if invalidas.any():
+                errores.append(f"{nombre}: valores no permitidos en filas {np.flatnonzero(invalidas)[:10].tolist()} "
+                               f"(opciones: {', '.join(categorias_validas)})")
+                continue
+            validadas[nombre] = categorias
+            continue
+
+        try:
+            numeros = np.asarray(valores, dtype=np.float64)
+        except (TypeError, ValueError):
+            errores.append(f"{nombre}: se esperaban valores numéricos.")
+            continue
+        if numeros.ndim != 1:
+            errores.append(f"{nombre}: se esperaba una lista de valores (sin listas anidadas).")
+            continue
+        malos = ~np.isfinite(numeros)
+        if nombre in VARIABLES_ENTERAS:
+            malos |= numeros != np.round(numeros)
+        if malos.any():
+            tipo = "enteros" if nombre in VARIABLES_ENTERAS else "numéricos finitos"
+            errores.append(f"{nombre}: se esperaban valores {tipo} (filas {np.flatnonzero(malos)[:10].tolist()}).")
+            continue
+        validadas[nombre] = numeros
+
+    if errores:
+        raise HTTPException(status_code=422, detail=errores)
+    return validadas, n_filas
+
+
+def construir_matriz(columnas, n_filas, columnas_input, defaults, categorias_validas, encoder, dtype=np.float64):
+    """
+    Valida las columnas (validar_columnas) y escribe el resultado en una matriz `dtype` (n, len(columnas_input))
+    lista para el modelo, con la variable categórica ya codificada.
+    """
+    columna_cat, mapeo, valor_defecto = _mapeo(encoder)
+    validadas, n_filas = validar_columnas(columnas, n_filas, columnas_input, defaults, categorias_validas, columna_cat)
+    X = np.empty((n_filas, len(columnas_input)), dtype=dtype)
+
+    for j, nombre in enumerate(columnas_input):
+        if nombre == columna_cat:
+            # Búsqueda por categoría (pocas categorías: una asignación vectorizada por cada una)
+            categorias = validadas[nombre]
+            for categoria in categorias_validas:
+                X[categorias == categoria, j] = mapeo.get(categoria, valor_defecto)
+        else:
+            X[:, j] = validadas[nombre]
+    return X
+
+
+# --- Scoring y respuesta ---
+def puntuar_matriz(modelo, X, columnas):
+    """
+    Probabilidad de default y clase predicha (argmax de predict_proba, igual que predict).
+    `columnas` son los nombres de las columnas de X: si el modelo fue entrenado con un DataFrame, sklearn los compara
+    con feature_names_in_ (un orden distinto es un error, no un aviso).
+    """
+    if len(X) == 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    if hasattr(modelo, 'feature_names_in_'):
+        X = pd.DataFrame(X, columns=columnas, copy=False)  # sin copiar la matriz
+    probabilidades = modelo.predict_proba(X)
+    clases = modelo.classes_[np.argmax(probabilidades, axis=1)].astype(np.int64)
+    return probabilidades[:, 1], clases
+
+
+def _codificar_respuesta(probs, clases, accept):
+    # Se redondea en float64 para que float32 y float64 respondan los mismos 4 decimales
+    probs = np.round(probs.astype(np.float64), 4)
+    if TIPO_ARROW in accept:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise HTTPException(status_code=406, detail="Formato Arrow no disponible: instale pyarrow en el servidor.")
+        tabla = pa.table({'prediction_class': clases, 'probability_default': probs})
+        sumidero = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sumidero, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+        return Response(sumidero.getvalue().to_pybytes(), media_type=TIPO_ARROW)
+
+    if any(t in accept for t in TIPOS_MSGPACK):
+        try:
+            import msgpack
+        except ImportError:
+            raise HTTPException(status_code=406, detail="Formato MessagePack no disponible: instale msgpack en el servidor.")
+        cuerpo = msgpack.packb({'prediction_class': clases.tolist(), 'probability_default': probs.tolist()})
+        return Response(cuerpo, media_type=TIPOS_MSGPACK[0])
+
+    cuerpo = json.dumps({'prediction_class': clases.tolist(), 'probability_default': probs.tolist()})
+    return Response(cuerpo, media_type=TIPO_JSON)
+
+
+def reglas_validacion(modulo):
+    """(defaults, categorias_validas) de ClienteData y NivelEducacionalEnum de `modulo`, para validar_columnas."""
+    defaults = {nombre: getattr(campo.default, 'value', campo.default)
+                for nombre, campo in modulo.ClienteData.model_fields.items()}
+    categorias_validas = [c.value for c in modulo.NivelEducacionalEnum]
+    return defaults, categorias_validas
+
+
+def _decodificar(cuerpo, tipo):
+    """(columnas, n_filas) del cuerpo según su Content-Type."""
+    try:
+        if tipo == TIPO_ARROW:
+            return _leer_arrow(cuerpo)
+        if tipo in TIPOS_MSGPACK:
+            return _leer_msgpack(cuerpo)
+        if tipo == TIPO_CSV:
+            return _leer_csv(cuerpo)
+        if tipo == TIPO_JSON:
+            return _leer_json(cuerpo)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"No se pudo decodificar el cuerpo ({tipo}): {e}")
+    raise HTTPException(status_code=415, detail=f"Content-Type no soportado: {tipo}")
+
+
+def procesar_lote(modulo, cuerpo, tipo, precision, accept, defaults, categorias_validas):
+    """Trabajo completo de una petición de /predict_batch: decodifica, valida, puntúa y codifica la respuesta."""
+    columnas, n_filas = _decodificar(cuerpo, tipo)
+    if precision == 'float32':
+        try:
+            puntuador = puntuador_por_hilo(modulo.MODELO_ML, modulo.ENCODER_TARGET, modulo.COLUMNAS_INPUT)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        # Las columnas validadas se codifican por bloques en los buffers del puntuador (sin matriz n x variables)
+        validadas, _ = validar_columnas(columnas, n_filas, modulo.COLUMNAS_INPUT, defaults, categorias_validas,
+                                        puntuador.columna_cat)
+        probs = puntuador.puntuar(validadas)
+        clases = puntuador.predecir_clase(probs).astype(np.int64)
+    else:
+        X = construir_matriz(columnas, n_filas, modulo.COLUMNAS_INPUT, defaults, categorias_validas,
+                             modulo.ENCODER_TARGET)
+        probs, clases = puntuar_matriz(modulo.MODELO_ML, X, modulo.COLUMNAS_INPUT)
+    return _codificar_respuesta(probs, clases, accept)
+
+
+def registrar_scoring_lote(app, modulo):
+    """Agrega POST /predict_batch a la app, usando MODELO_ML, ENCODER_TARGET y ClienteData de `modulo`."""
+    defaults, categorias_validas = reglas_validacion(modulo)
+
+    @app.post(
+        "/predict_batch",
+        summary="Predicción masiva (JSON columnar, Arrow o MessagePack)",
+        description=f"""
+    Puntúa muchos clientes en una sola petición. El cuerpo es un objeto con una lista por variable
+    ({', '.join(modulo.COLUMNAS_INPUT)}), según `Content-Type`:
+    - `{TIPO_JSON}`: objeto de columnas (también acepta una lista de clientes como en /predict).
+    - `{TIPO_ARROW}`: tabla Apache Arrow (formato IPC stream).
+    - `{TIPOS_MSGPACK[0]}`: mapa de columnas en MessagePack.
+    - `{TIPO_CSV}`: archivo CSV con encabezado (separador "," o ";"), como el que envía /form.
+
+    Con `?precision=float32` el modelo logístico puntúa en float32 con buffers reutilizables
+    (diferencia máxima con float64 documentada en scoring_precision.TOLERANCIA_FLOAT32).
+
+    La respuesta usa el formato pedido en `Accept` (JSON por defecto) con las columnas
+    `prediction_class` y `probability_default`.
+    """,
+    )
+    async def predecir_lote(request: Request):
+        if modulo.MODELO_ML is None or modulo.ENCODER_TARGET is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Error de inicialización: Los archivos model.pkl o encoder.pkl no se pudieron cargar al iniciar el servidor."
+            )
+
+        tipo = request.headers.get('content-type', TIPO_JSON).split(';')[0].strip().lower()
+        precision = request.query_params.get('precision', 'float64')
+        if precision not in ('float64', 'float32'):
+            raise HTTPException(status_code=422, detail="precision debe ser 'float64' o 'float32'.")
+        cuerpo = await request.body()
+
+        # Decodificación, validación y scoring corren fuera del event loop (lotes grandes no bloquean otras peticiones)
+        return await run_in_threadpool(procesar_lote, modulo, cuerpo, tipo, precision,
+                                       request.headers.get('accept', TIPO_JSON).lower(), defaults, categorias_validas)
+
+    return predecir_lote
@@ -0,0 +1,139 @@
+# scoring_precision.py
+# Scoring de precisión reducida (float32) para el modelo logístico, con buffers preasignados y reutilizables.
+#
+# El camino habitual (DataFrame float64 -> ENCODER_TARGET.transform -> predict_proba) crea varias copias completas
+# de la matriz de variables. Aquí cada bloque de filas se codifica directamente en un buffer fijo (capacidad x variables)
+# y se puntúa con los coeficientes del modelo: la memoria adicional no depende del número de filas.
+#
+# Tolerancia: |p_float32 - p_float64| <= TOLERANCIA_FLOAT32 respecto de predict_proba(...)[:, 1] en float64
+# (verificado con el dataset de entrenamiento y con datos sintéticos en los rangos de entrenamiento).
+
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from codificador_target import extraer_mapeo_encoder
+
+TOLERANCIA_FLOAT32 = 1e-5
+CAPACIDAD_BUFFER = 65_536
+
+
+def extraer_coeficientes(modelo):
+    """
+    Devuelve (pesos, sesgo) tales que predict_proba(X)[:, 1] = sigmoide(X @ pesos + sesgo).
+    Soporta LogisticRegression / SGDClassifier(loss='log_loss') y un Pipeline con StandardScaler previo
+    (el escalado se incorpora a los coeficientes).
+    """
+    media, escala = None, None
+    if isinstance(modelo, Pipeline):
+        *pasos, (_, modelo) = modelo.steps
+        if len(pasos) != 1 or not isinstance(pasos[0][1], StandardScaler):
+            raise ValueError("Solo se admite un Pipeline de la forma [StandardScaler, modelo lineal].")
+        escalador = pasos[0][1]
+        media, escala = escalador.mean_, escalador.scale_
+
+    if not hasattr(modelo, 'coef_') or modelo.coef_.shape[0] != 1:
+        raise ValueError(f"El modo float32 requiere un modelo lineal binario; se recibió {type(modelo).__name__}.")
+    if getattr(modelo, 'loss', 'log_loss') not in ('log_loss', 'log'):
+        raise ValueError("El modo float32 requiere un modelo con salida logística (loss='log_loss').")
+
+    pesos = modelo.coef_[0].astype(np.float64)
+    sesgo = float(modelo.intercept_[0])
+    if escala is not None:
+        pesos = pesos / escala
+    if media is not None:
+        sesgo -= float(pesos @ media)
+    return pesos, sesgo
+
+
+class PuntuadorLineal:
+    """
+    Puntúa bloques de hasta `capacidad` filas en buffers preasignados de tipo `dtype` (float32 por defecto).
+    No es seguro compartir una instancia entre hilos (ver puntuador_por_hilo).
+    """
+
+    def __init__(self, modelo, encoder, columnas_input, dtype=np.float32, capacidad=CAPACIDAD_BUFFER):
+        self.modelo = modelo
+        self.encoder = encoder
+        self.columnas_input = list(columnas_input)
+        self.dtype = np.dtype(dtype)
+        self.capacidad = capacidad
+
+        pesos, sesgo = extraer_coeficientes(modelo)
+        self.pesos = pesos.astype(self.dtype)
+        self.sesgo = self.dtype.type(sesgo)
+        self.clases = modelo.classes_
+
+        # Tabla de búsqueda del encoder: código de categoría -> valor; el código -1 (desconocida) toma el último (prior)
+        self.columna_cat, mapeo, valor_defecto = extraer_mapeo_encoder(encoder)
+        self.categorias = pd.Index(list(mapeo))
+        self.tabla = np.array([*mapeo.values(), valor_defecto], dtype=self.dtype)
+
+        # Orden Fortran: cada variable se escribe en memoria contigua
+        self._X = np.empty((capacidad, len(self.columnas_input)), dtype=self.dtype, order='F')
+        self._z = np.empty(capacidad, dtype=self.dtype)
+
+    def _sigmoide(self, z):
+        with np.errstate(over='ignore'):
+            np.negative(z, out=z)
+            np.exp(z, out=z)
+            z += 1
+            np.reciprocal(z, out=z)
+        return z
+
+    def puntuar(self, datos, salida=None):
+        """
+        Probabilidad de la clase positiva para `datos` sin codificar (DataFrame o {variable: arreglo}).
+        Si se entrega `salida` (arreglo de largo n) se escribe allí; si no, se crea uno del tipo del puntuador.
+        """
+        columnas = {nombre: datos[nombre] for nombre in self.columnas_input}
+        n = len(columnas[self.columnas_input[0]])
+        salida = np.empty(n, dtype=self.dtype) if salida is None else salida
+
+        for inicio in range(0, n, self.capacidad):
+            fin = min(inicio + self.capacidad, n)
+            X = self._X[:fin - inicio]
+            for j, nombre in enumerate(self.columnas_input):
+                # Se convierte solo el bloque (una columna de texto completa duplicaría la memoria)
+                columna = columnas[nombre]
+                valores = columna.iloc[inicio:fin] if hasattr(columna, 'iloc') else columna[inicio:fin]
+                if nombre == self.columna_cat:
+                    codigos = self.categorias.get_indexer(valores)
+                    np.take(self.tabla, codigos, out=X[:, j], mode='wrap')
+                else:
+                    np.copyto(X[:, j], valores, casting='unsafe')
+            salida[inicio:fin] = self._puntuar_bloque(X)
+        return salida
+
+    def puntuar_matriz(self, X, salida=None):
+        """Probabilidad de la clase positiva para una matriz ya codificada (columnas en el orden de columnas_input)."""
+        n = len(X)
+        salida = np.empty(n, dtype=self.dtype) if salida is None else salida
+        for inicio in range(0, n, self.capacidad):
+            fin = min(inicio + self.capacidad, n)
+            salida[inicio:fin] = self._puntuar_bloque(X[inicio:fin])
+        return salida
+
+    def _puntuar_bloque(self, X):
+        z = self._z[:len(X)]
+        np.dot(X, self.pesos, out=z)
+        z += self.sesgo
+        return self._sigmoide(z)
+
+    def predecir_clase(self, probs):
+        """Clase predicha a partir de la probabilidad positiva (igual que predict: argmax de predict_proba)."""
+        return self.clases[(probs > 0.5).astype(np.intp)]
+
+
+_LOCAL = threading.local()
+
+
+def puntuador_por_hilo(modelo, encoder, columnas_input):
+    """Un PuntuadorLineal float32 por hilo (los buffers se reutilizan entre peticiones del mismo hilo)."""
+    puntuador = getattr(_LOCAL, 'puntuador', None)
+    if puntuador is None or puntuador.modelo is not modelo or puntuador.encoder is not encoder:
+        puntuador = _LOCAL.puntuador = PuntuadorLineal(modelo, encoder, columnas_input)
+    return puntuador
@@ -0,0 +1,228 @@
+# scoring_ws.py
+# Canal WebSocket persistente para clientes de alta frecuencia (endpoint /ws/predict).
+#
+# El cliente mantiene una conexión abierta y envía peticiones etiquetadas con un id de correlación:
+#   {"id": "tx-1", "datos": {"Edad": 35, "Nivel_Educacional": "Med", ...}}   (o una lista de ellas en un mismo frame)
+# El servidor agrupa en micro-lotes los mensajes de la conexión (hasta MAX_LOTE o ESPERA_LOTE_MS) y responde
+# cada lote apenas termina, por lo que las respuestas pueden llegar fuera de orden:
+#   [{"id": "tx-1", "prediction_status": ..., "prediction_class": 0, "probability_default": 0.0123}, ...]
+# Control de flujo: cada conexión admite como máximo MAX_EN_VUELO mensajes sin responder; al llegar al límite
+# el servidor deja de leer el socket (la presión se propaga al cliente por TCP) hasta que se liberen respuestas.
+# Mensajes de control: {"tipo": "metricas"} devuelve las métricas de la conexión; GET /ws/metricas las de todas.
+# Los frames binarios o con JSON inválido se responden con {"tipo": "error", "detail": ...} sin cerrar la conexión.
+
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from scoring_lote import construir_matriz, puntuar_matriz, reglas_validacion
+
+MAX_EN_VUELO = 1024        # mensajes sin responder por conexión
+MAX_LOTE = 256             # tamaño máximo de un micro-lote
+ESPERA_LOTE_MS = 2.0       # espera máxima para completar un micro-lote
+LOTES_CONCURRENTES = 2     # micro-lotes puntuándose a la vez por conexión
+VENTANA_LATENCIAS = 10_000
+
+
+class MetricasConexion:
+    """Contadores y latencias (recepción -> envío) de una conexión."""
+
+    def __init__(self, id_conexion):
+        self.id_conexion = id_conexion
+        self.inicio = time.time()
+        self.recibidos = 0
+        self.respondidos = 0
+        self.errores = 0
+        self.lotes = 0
+        self.en_vuelo = 0
+        self.max_en_vuelo_observado = 0
+        self.esperas_control_flujo = 0
+        self.latencias = deque(maxlen=VENTANA_LATENCIAS)
+
+    def resumen(self):
+        segundos = max(time.time() - self.inicio, 1e-9)
+        resumen = {
+            'conexion': self.id_conexion,
+            'segundos_abierta': round(segundos, 3),
+            'recibidos': self.recibidos,
+            'respondidos': self.respondidos,
+            'errores': self.errores,
+            'en_vuelo': self.en_vuelo,
+            'max_en_vuelo_observado': self.max_en_vuelo_observado,
+            'esperas_control_flujo': self.esperas_control_flujo,
+            'lotes': self.lotes,
+            'tamano_medio_lote': round((self.respondidos - self.errores) / self.lotes, 2) if self.lotes else 0.0,
+            'respuestas_por_segundo': round(self.respondidos / segundos, 2),
+        }
+        if self.latencias:
+            p50, p95, p99 = np.percentile(np.fromiter(self.latencias, float), [50, 95, 99]) * 1000
+            resumen['latencia_ms'] = {'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3)}
+        return resumen
+
+
+class ConexionScoring:
+    """Atiende una conexión: lectura con control de flujo, micro-lotes y envío de respuestas a medida que terminan."""
+
+    def __init__(self, websocket, modulo, defaults, categorias_validas, metricas):
+        self.websocket = websocket
+        self.modulo = modulo
+        self.defaults = defaults
+        self.categorias_validas = categorias_validas
+        self.metricas = metricas
+        self.cola = asyncio.Queue()
+        self.cupos = asyncio.Semaphore(MAX_EN_VUELO)
+        self.cupos_lotes = asyncio.Semaphore(LOTES_CONCURRENTES)
+        self.lock_envio = asyncio.Lock()
+        self.tareas = set()
+
+    async def enviar(self, mensaje):
+        async with self.lock_envio:
+            await self.websocket.send_text(json.dumps(mensaje))
+
+    def _liberar(self, n):
+        self.metricas.en_vuelo -= n
+        self.metricas.respondidos += n
+        for _ in range(n):
+            self.cupos.release()
+
+    # --- Lectura ---
+    async def leer(self):
+        while True:
+            frame = await self.websocket.receive()
+            if frame['type'] == 'websocket.disconnect':
+                raise WebSocketDisconnect(frame.get('code', 1000), frame.get('reason'))
+            texto = frame.get('text')
+            if texto is None:
+                await self.enviar({'tipo': 'error', 'detail': 'Solo se aceptan mensajes de texto (JSON).'})
+                continue
+            try:
+                mensajes = json.loads(texto)
+            except json.JSONDecodeError:
+                await self.enviar({'tipo': 'error', 'detail': 'El mensaje no es JSON válido.'})
+                continue
+            if isinstance(mensajes, dict) and mensajes.get('tipo') == 'metricas':
+                await self.enviar({'tipo': 'metricas', **self.metricas.resumen()})
+                continue
+            for mensaje in mensajes if isinstance(mensajes, list) else [mensajes]:
+                await self._admitir(mensaje)
+
+    async def _admitir(self, mensaje):
+        if self.cupos.locked():
+            self.metricas.esperas_control_flujo += 1
+        await self.cupos.acquire()
+        recibido = time.perf_counter()
+        self.metricas.recibidos += 1
+        self.metricas.en_vuelo += 1
+        self.metricas.max_en_vuelo_observado = max(self.metricas.max_en_vuelo_observado, self.metricas.en_vuelo)
+
+        id_mensaje = mensaje.get('id') if isinstance(mensaje, dict) else None
+        try:
+            if id_mensaje is None:
+                raise ValueError("Cada mensaje debe ser un objeto con 'id' y 'datos'.")
+            cliente = self.modulo.ClienteData(**(mensaje.get('datos') or {}))
+        except (ValidationError, ValueError, TypeError) as e:
+            detalle = e.errors(include_url=False) if isinstance(e, ValidationError) else str(e)
+            self.metricas.errores += 1
+            await self.enviar([{'id': id_mensaje, 'error': json.loads(json.dumps(detalle, default=str))}])
+            self._liberar(1)
+            return
+        self.cola.put_nowait((id_mensaje, cliente.model_dump(mode='json'), recibido))
+
+    # --- Micro-lotes ---
+    async def agrupar(self):
+        while True:
+            lote = [await self.cola.get()]
+            limite = time.perf_counter() + ESPERA_LOTE_MS / 1000
+            while len(lote) < MAX_LOTE:
+                restante = limite - time.perf_counter()
+                if self.cola.empty() and restante <= 0:
+                    break
+                try:
+                    lote.append(self.cola.get_nowait() if not self.cola.empty()
+                                else await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            await self.cupos_lotes.acquire()
+            tarea = asyncio.create_task(self._puntuar_lote(lote))
+            self.tareas.add(tarea)
+            tarea.add_done_callback(self.tareas.discard)
+
+    def _puntuar(self, lote):
+        # Construcción de la matriz y scoring: trabajo numérico que corre fuera del event loop
+        columnas = {nombre: [datos[nombre] for _, datos, _ in lote] for nombre in self.modulo.COLUMNAS_INPUT}
+        X = construir_matriz(columnas, len(lote), self.modulo.COLUMNAS_INPUT, self.defaults,
+                             self.categorias_validas, self.modulo.ENCODER_TARGET)
+        return puntuar_matriz(self.modulo.MODELO_ML, X, self.modulo.COLUMNAS_INPUT)
+
+    async def _puntuar_lote(self, lote):
+        try:
+            probs, clases = await run_in_threadpool(self._puntuar, lote)
+            respuestas = [{'id': id_mensaje, **self.modulo.construir_respuesta(clase, float(prob))}
+                          for (id_mensaje, _, _), clase, prob in zip(lote, clases, probs)]
+            self.metricas.lotes += 1
+        except Exception as e:
+            self.metricas.errores += len(lote)
+            respuestas = [{'id': id_mensaje, 'error': f"Error interno al procesar la predicción: {e}"}
+                          for id_mensaje, _, _ in lote]
+        finally:
+            self.cupos_lotes.release()
+        try:
+            await self.enviar(respuestas)
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # el cliente cerró la conexión antes de recibir el lote
+        finally:
+            ahora = time.perf_counter()
+            self.metricas.latencias.extend(ahora - recibido for _, _, recibido in lote)
+            self._liberar(len(lote))
+
+    async def atender(self):
+        await self.enviar({'tipo': 'bienvenida', 'conexion': self.metricas.id_conexion,
+                           'max_en_vuelo': MAX_EN_VUELO, 'max_lote': MAX_LOTE, 'espera_lote_ms': ESPERA_LOTE_MS})
+        agrupador = asyncio.create_task(self.agrupar())
+        try:
+            await self.leer()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            agrupador.cancel()
+            for tarea in list(self.tareas):
+                tarea.cancel()
+
+
+def registrar_scoring_ws(app, modulo):
+    """Agrega WebSocket /ws/predict y GET /ws/metricas a la app, usando MODELO_ML, ENCODER_TARGET y ClienteData de `modulo`."""
+    defaults, categorias_validas = reglas_validacion(modulo)
+    conexiones = {}
+    contador = itertools.count(1)
+
+    @app.websocket("/ws/predict")
+    async def predecir_ws(websocket: WebSocket):
+        await websocket.accept()
+        if modulo.MODELO_ML is None or modulo.ENCODER_TARGET is None:
+            await websocket.send_text(json.dumps({
+                'tipo': 'error',
+                'detail': "Error de inicialización: Los archivos model.pkl o encoder.pkl no se pudieron cargar al iniciar el servidor."
+            }))
+            await websocket.close(code=1011)
+            return
+
+        metricas = MetricasConexion(next(contador))
+        conexiones[metricas.id_conexion] = metricas
+        try:
+            await ConexionScoring(websocket, modulo, defaults, categorias_validas, metricas).atender()
+        finally:
+            del conexiones[metricas.id_conexion]
+
+    @app.get("/ws/metricas", summary="Métricas de las conexiones WebSocket activas")
+    def metricas_ws():
+        return {'conexiones_activas': len(conexiones),
+                'conexiones': [m.resumen() for m in list(conexiones.values())]}
+
+    return conexiones
@@ -0,0 +1,163 @@
+// formulario.js
+// Lógica del formulario de /form: un cliente -> POST /predict; archivo CSV -> POST /predict_batch (una sola petición).
+// Las rutas de la API se leen de los atributos data-* del formulario (relativas al mismo origen por defecto).
+
+const form = document.getElementById('predictionForm');
+const resultBox = document.getElementById('resultBox');
+const resultTitle = document.getElementById('resultTitle');
+const resultText = document.getElementById('resultText');
+const probabilityText = document.getElementById('probabilityText');
+const errorBox = document.getElementById('errorBox');
+const errorText = document.getElementById('errorText');
+const submitButton = document.getElementById('submitButton');
+const buttonText = document.getElementById('buttonText');
+const loader = document.getElementById('loader');
+
+const csvForm = document.getElementById('csvForm');
+const csvFile = document.getElementById('csvFile');
+const csvButton = document.getElementById('csvButton');
+const csvButtonText = document.getElementById('csvButtonText');
+const csvLoader = document.getElementById('csvLoader');
+const batchBox = document.getElementById('batchBox');
+const batchSummary = document.getElementById('batchSummary');
+const batchTable = document.getElementById('batchTable');
+const batchDownload = document.getElementById('batchDownload');
+
+const API_URL = form.dataset.apiPredict;
+const API_BATCH_URL = form.dataset.apiBatch;
+const FILAS_VISIBLES = 20;
+
+const ENTEROS = ['Edad', 'Años_Trabajando'];
+const DECIMALES = ['Ingresos', 'Deuda_Comercial', 'Deuda_Credito', 'Otras_Deudas', 'Ratio_Ingresos_Deudas'];
+
+function limpiarResultados() {
+    resultBox.classList.add('hidden');
+    batchBox.classList.add('hidden');
+    errorBox.classList.add('hidden');
+}
+
+function mostrarError(detalle) {
+    // detail puede ser texto, una lista de textos (/predict_batch) o la lista de errores de validación de FastAPI
+    if (Array.isArray(detalle)) {
+        detalle = detalle.map(d => (typeof d === 'string' ? d : (d.loc || []).join('.') + ': ' + d.msg)).join(' | ');
+    }
+    errorText.textContent = detalle || 'Error desconocido del servidor.';
+    errorBox.classList.remove('hidden');
+}
+
+function cargando(boton, texto, indicador, activo, etiqueta) {
+    boton.disabled = activo;
+    texto.textContent = etiqueta;
+    indicador.classList.toggle('hidden', !activo);
+}
+
+// --- Un cliente: /predict ---
+form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    limpiarResultados();
+    cargando(submitButton, buttonText, loader, true, 'Evaluando...');
+
+    // Convertir FormData a JSON (Pydantic espera los tipos correctos)
+    const payload = {};
+    for (const [key, value] of new FormData(form).entries()) {
+        if (ENTEROS.includes(key)) {
+            payload[key] = parseInt(value);
+        } else if (DECIMALES.includes(key)) {
+            payload[key] = parseFloat(value);
+        } else {
+            payload[key] = value;
+        }
+    }
+
+    try {
+        const response = await fetch(API_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+        const data = await response.json();
+
+        if (!response.ok) {
+            mostrarError(data.detail);
+            return;
+        }
+
+        const prob = (data.probability_default * 100).toFixed(2);
+        resultTitle.textContent = 'Resultado de Evaluación';
+        resultText.textContent = data.prediction_status;
+        probabilityText.textContent = 'Probabilidad de Default: ' + prob + '%';
+
+        if (data.prediction_class === 1) {
+            resultBox.className = 'mt-8 p-5 rounded-xl border-l-4 border-red-500 bg-red-50 text-red-800';
+        } else {
+            resultBox.className = 'mt-8 p-5 rounded-xl border-l-4 border-green-500 bg-green-50 text-green-800';
+        }
+        resultBox.classList.remove('hidden');
+
+    } catch (error) {
+        mostrarError('No se pudo conectar con la API: ' + error.message);
+    } finally {
+        cargando(submitButton, buttonText, loader, false, 'Evaluar Riesgo');
+    }
+});
+
+// --- Archivo CSV: /predict_batch en una sola petición ---
+csvForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    limpiarResultados();
+    const archivo = csvFile.files[0];
+    if (!archivo) {
+        mostrarError('Seleccione un archivo CSV.');
+        return;
+    }
+    cargando(csvButton, csvButtonText, csvLoader, true, 'Evaluando archivo...');
+
+    try {
+        // El archivo se envía tal cual; el servidor lo valida por columnas
+        const response = await fetch(API_BATCH_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'text/csv', 'Accept': 'application/json' },
+            body: archivo
+        });
+        const data = await response.json();
+
+        if (!response.ok) {
+            mostrarError(data.detail);
+            return;
+        }
+        mostrarLote(data.prediction_class, data.probability_default);
+
+    } catch (error) {
+        mostrarError('No se pudo conectar con la API: ' + error.message);
+    } finally {
+        cargando(csvButton, csvButtonText, csvLoader, false, 'Evaluar Archivo CSV');
+    }
+});
+
+function mostrarLote(clases, probabilidades) {
+    const n = clases.length;
+    const altoRiesgo = clases.filter(c => c === 1).length;
+    const promedio = n ? probabilidades.reduce((a, b) => a + b, 0) / n : 0;
+    batchSummary.textContent = n + ' clientes evaluados | ALTO RIESGO: ' + altoRiesgo
+        + ' (' + (n ? (100 * altoRiesgo / n).toFixed(1) : '0.0') + '%) | Probabilidad media: '
+        + (100 * promedio).toFixed(2) + '%';
+
+    const filas = ['<tr class="text-left text-gray-500"><th class="pr-4">Fila</th><th class="pr-4">Clase</th><th>Prob. Default</th></tr>'];
+    for (let i = 0; i < Math.min(n, FILAS_VISIBLES); i++) {
+        const color = clases[i] === 1 ? 'text-red-700' : 'text-green-700';
+        filas.push('<tr class="' + color + '"><td class="pr-4">' + (i + 1) + '</td><td class="pr-4">' + clases[i]
+            + '</td><td>' + (100 * probabilidades[i]).toFixed(2) + '%</td></tr>');
+    }
+    batchTable.innerHTML = filas.join('');
+
+    // Resultados completos descargables (fila del CSV original, clase y probabilidad)
+    const lineas = ['fila,prediction_class,probability_default'];
+    for (let i = 0; i < n; i++) {
+        lineas.push((i + 1) + ',' + clases[i] + ',' + probabilidades[i]);
+    }
+    if (batchDownload.href) {
+        URL.revokeObjectURL(batchDownload.href);
+    }
+    batchDownload.href = URL.createObjectURL(new Blob([lineas.join('\n')], { type: 'text/csv' }));
+    batchBox.classList.remove('hidden');
+}
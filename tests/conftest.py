@@ -0,0 +1,30 @@
+# conftest.py
+# Recursos compartidos por las pruebas: módulos de src/ importables, la app desplegada y los datos de desarrollo.
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ / "src"))
+
+
+@pytest.fixture(scope="session")
+def api():
+    """Módulo main con MODELO_ML y ENCODER_TARGET cargados desde model/."""
+    import main
+    if main.MODELO_ML is None or main.ENCODER_TARGET is None:
+        pytest.skip("model/model.pkl o model/encoder.pkl no se pudieron cargar")
+    return main
+
+
+@pytest.fixture(scope="session")
+def datos_desarrollo():
+    """Hoja 'Desarrollo' con la misma limpieza que notebooks/modelamiento_fraude.cargar_datos."""
+    df = pd.read_excel(RAIZ / "data" / "Tabla Trabajo Grupal N°2.xlsx", sheet_name='Desarrollo')
+    df.columns = df.columns.str.strip()
+    df = df.drop_duplicates().drop(columns=['Id_Cliente'])
+    df['Nivel_Educacional'] = df['Nivel_Educacional'].astype(object)
+    return df.reset_index(drop=True)
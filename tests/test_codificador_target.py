@@ -0,0 +1,54 @@
+# test_codificador_target.py
+# CodificadorTarget debe reproducir category_encoders.TargetEncoder (mismos parámetros) y su codificación
+# fuera de pliegue debe coincidir con reajustar el codificador sin cada pliegue.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from codificador_target import CodificadorTarget
+
+COLUMNA = 'Nivel_Educacional'
+
+
+@pytest.fixture(scope="module")
+def entrenamiento(datos_desarrollo):
+    """X, y de desarrollo con faltantes y una categoría rara (menos filas que min_samples_leaf)."""
+    X = datos_desarrollo.drop(columns='Default')
+    X.loc[X.index[::97], COLUMNA] = np.nan
+    X.loc[X.index[1::211], COLUMNA] = 'Tecnico'
+    return X, datos_desarrollo['Default']
+
+
+def test_paridad_con_category_encoders(entrenamiento):
+    ce = pytest.importorskip('category_encoders')
+    X, y = entrenamiento
+    nativo = CodificadorTarget(COLUMNA, min_samples_leaf=20, smoothing=10).fit(X, y)
+    referencia = ce.TargetEncoder(cols=[COLUMNA], min_samples_leaf=20, smoothing=10).fit(X, y)
+
+    # Filas de entrenamiento más una categoría no vista y faltantes (NaN y None)
+    nuevos = X.head(3).assign(**{COLUMNA: ['Doctorado', np.nan, None]})
+    datos = pd.concat([X, nuevos], ignore_index=True)
+    obtenido = nativo.transform(datos)[COLUMNA].to_numpy(dtype=float)
+    esperado = referencia.transform(datos)[COLUMNA].to_numpy(dtype=float)
+
+    assert np.allclose(obtenido, esperado)
+    assert obtenido[-3] == pytest.approx(nativo.prior_)
+
+
+def test_oof_igual_a_reajuste_por_pliegue(entrenamiento):
+    X, y = entrenamiento
+    n_pliegues, semilla = 5, 21
+    codificado = CodificadorTarget(COLUMNA).ajustar_transformar_oof(X, y, n_pliegues=n_pliegues, semilla=semilla)
+
+    # Misma asignación de pliegues que ajustar_transformar_oof
+    pliegues = np.empty(len(y), dtype=np.int64)
+    pliegues[np.random.default_rng(semilla).permutation(len(y))] = np.arange(len(y)) % n_pliegues
+    esperado = np.empty(len(y))
+    for pliegue in range(n_pliegues):
+        dentro = pliegues == pliegue
+        codificador = CodificadorTarget(COLUMNA).fit(X[~dentro], y[~dentro])
+        esperado[dentro] = codificador.transform(X[dentro])[COLUMNA].to_numpy(dtype=float)
+
+    assert np.allclose(codificado[COLUMNA].to_numpy(dtype=float), esperado)
+    pd.testing.assert_frame_equal(codificado.drop(columns=COLUMNA), X.drop(columns=COLUMNA))
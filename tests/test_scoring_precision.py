@@ -0,0 +1,52 @@
+# test_scoring_precision.py
+# El scoring en float32 (PuntuadorLineal y /predict_batch?precision=float32) no debe alejarse de predict_proba
+# en float64 más que TOLERANCIA_FLOAT32 sobre los datos de desarrollo.
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import scoring_lote
+from scoring_precision import PuntuadorLineal, TOLERANCIA_FLOAT32
+
+
+def _referencia_float64(api, X):
+    X_encoded = api.ENCODER_TARGET.transform(X)
+    return api.MODELO_ML.predict_proba(X_encoded)[:, 1], api.MODELO_ML.predict(X_encoded)
+
+
+def test_puntuador_float32_dentro_de_tolerancia(api, datos_desarrollo):
+    X = datos_desarrollo[api.COLUMNAS_INPUT]
+    esperado, clases_esperadas = _referencia_float64(api, X)
+
+    puntuador = PuntuadorLineal(api.MODELO_ML, api.ENCODER_TARGET, api.COLUMNAS_INPUT, dtype=np.float32)
+    probs = puntuador.puntuar(X)
+
+    assert probs.dtype == np.float32
+    assert np.max(np.abs(probs.astype(np.float64) - esperado)) <= TOLERANCIA_FLOAT32
+    np.testing.assert_array_equal(puntuador.predecir_clase(probs), clases_esperadas)
+
+
+def test_predict_batch_float32_dentro_de_tolerancia(api, datos_desarrollo, monkeypatch):
+    X = datos_desarrollo[api.COLUMNAS_INPUT]
+    esperado, clases_esperadas = _referencia_float64(api, X)
+
+    # La respuesta se redondea a 4 decimales: la tolerancia se verifica sobre las probabilidades antes de codificarla
+    capturadas = []
+    codificar = scoring_lote._codificar_respuesta
+
+    def capturar(probs, clases, accept):
+        capturadas.append(probs)
+        return codificar(probs, clases, accept)
+
+    monkeypatch.setattr(scoring_lote, '_codificar_respuesta', capturar)
+    cuerpo = {c: X[c].tolist() for c in api.COLUMNAS_INPUT}
+    respuesta = TestClient(api.app).post('/predict_batch?precision=float32', json=cuerpo)
+
+    assert respuesta.status_code == 200
+    (probs,) = capturadas
+    assert probs.dtype == np.float32
+    assert np.max(np.abs(probs.astype(np.float64) - esperado)) <= TOLERANCIA_FLOAT32
+
+    resultado = respuesta.json()
+    np.testing.assert_array_equal(resultado['prediction_class'], clases_esperadas)
+    assert np.max(np.abs(np.array(resultado['probability_default']) - esperado)) <= 5e-5 + TOLERANCIA_FLOAT32